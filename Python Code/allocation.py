@@ -0,0 +1,413 @@
+import heapq
+import numpy as np
+
+ALLOCATION_MODES = ("greedy", "auction", "hungarian")
+
+# Cost of leaving a robot without gold. It is above any walking distance, so
+# robots are only left idle once every gold has its pair.
+IDLE_COST = 1e6
+# Factor eps shrinks by between auction phases
+EPS_SCALE = 8
+
+ROBOT = 0
+PHANTOM = 1
+GOLD_SLOT = 0
+IDLE_SLOT = 1
+
+def make_allocator(mode):
+    if mode == "greedy":
+        return GreedyAllocator()
+    if mode == "auction":
+        return AuctionAllocator()
+    if mode == "hungarian":
+        return HungarianAllocator()
+    raise ValueError(f"Unknown allocation mode {mode!r}, expected one of {ALLOCATION_MODES}")
+
+def _distance(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+# Every engine takes the idle robots as {robot id: coord} and the gold to
+# cover as a list of coords, and returns {gold coord: (robot id, robot id)}.
+# Each gold needs two robots, so it is split into two slots.
+
+def _solve_pairs(solve, robots, golds):
+    # solve(robots, golds) returns {gold coord: [robot ids in its slots]}. An
+    # assignment over single slots cannot make a gold's two slots all or
+    # nothing: with fewer robots than slots, one robot on each of two golds
+    # is often cheaper than a pair on one, and half-covered gold is no use.
+    # So the half-covered gold with the longest walks is dropped (half of it,
+    # rounded up) and the rest solved again until every covered gold has a pair.
+    golds = list(golds)
+    while True:
+        covered = solve(robots, golds)
+        half = [(_distance(robots[covered[coord][0]], coord), i) for i, coord in enumerate(golds)
+                if len(covered.get(coord, ())) == 1]
+        if not half:
+            return {coord: tuple(ids) for coord, ids in covered.items()}
+        dropped = {i for _, i in sorted(half, reverse=True)[:(len(half) + 1) // 2]}
+        golds = [coord for i, coord in enumerate(golds) if i not in dropped]
+
+class GreedyAllocator:
+    # Gold in the order given, each taking the two nearest robots still free
+    def allocate(self, robots, golds):
+        free = dict(robots)
+        result = {}
+        for coord in golds:
+            if len(free) < 2:
+                break
+            pair = tuple(heapq.nsmallest(2, free, key=lambda robot_id: _distance(free[robot_id], coord)))
+            result[coord] = pair
+            for robot_id in pair:
+                del free[robot_id]
+        return result
+
+class AuctionAllocator:
+    # Forward auction with eps-scaling: robots bid for slots (two per gold,
+    # plus one idle slot per robot). Two phantom bidders per gold, indifferent
+    # between slots like HungarianAllocator's phantom rows, keep the problem
+    # square, so prices stay valid from one eps phase to the next. Prices and
+    # robot assignments carry over between calls; robots whose assignment is
+    # no longer within eps of their best bid are released, so a call only
+    # rebids for what changed.
+    def __init__(self):
+        self.prices = {}      # slot key -> price
+        self.assignment = {}  # robot id -> (robot coord, slot key)
+
+    def allocate(self, robots, golds):
+        return _solve_pairs(self._solve, robots, golds)
+
+    def _solve(self, robots, golds):
+        robot_ids = list(robots)
+        n = len(robot_ids)
+        if n == 0:
+            self.assignment = {}
+            return {}
+        slots = [("gold", coord, k) for coord in golds for k in range(2)]
+        slots += [("idle", k) for k in range(n)]
+        slot_index = {slot: j for j, slot in enumerate(slots)}
+        n_gold_slots = 2 * len(golds)
+
+        rx = np.array([robots[robot_id][0] for robot_id in robot_ids], dtype=np.float64)
+        ry = np.array([robots[robot_id][1] for robot_id in robot_ids], dtype=np.float64)
+        gx = np.array([coord[0] for coord in golds for _ in range(2)], dtype=np.float64)
+        gy = np.array([coord[1] for coord in golds for _ in range(2)], dtype=np.float64)
+        distance = np.abs(rx[:, None] - gx) + np.abs(ry[:, None] - gy)
+        # Idling only has to cost more than any walk. Keeping it just above the
+        # longest one (rather than IDLE_COST) keeps the prices robots bid up
+        # for contested gold small.
+        idle_cost = distance.max() + 1 if n_gold_slots else 1.0
+        # Rows past n are the phantoms, which value every slot at 0
+        benefit = np.zeros((n + n_gold_slots, len(slots)))
+        benefit[:n] = -idle_cost
+        benefit[:n, :n_gold_slots] = -distance
+        prices = np.array([self.prices.get(slot, 0.0) for slot in slots])
+
+        owner = np.full(len(slots), -1)
+        assigned = np.full(len(benefit), -1)
+        for i, robot_id in enumerate(robot_ids):
+            previous = self.assignment.get(robot_id)
+            if previous is not None and previous[0] == robots[robot_id]:
+                j = slot_index.get(previous[1])
+                if j is not None and owner[j] == -1:
+                    owner[j] = i
+                    assigned[i] = j
+
+        # Integer costs, so eps below 1/(n + 1) gives an optimal assignment.
+        # Bidding at that eps from the start lets the bidders for the two slots
+        # of one gold outbid each other eps at a time, so eps starts large and
+        # shrinks by EPS_SCALE each phase.
+        final_eps = 1.0 / (len(benefit) + 1)
+        eps = max(final_eps, idle_cost / EPS_SCALE)
+        while True:
+            self._bid(benefit, prices, owner, assigned, eps)
+            if eps == final_eps:
+                break
+            eps = max(final_eps, eps / EPS_SCALE)
+
+        self.prices = {slot: prices[j] for j, slot in enumerate(slots) if prices[j]}
+        self.assignment = {robot_id: (robots[robot_id], slots[assigned[i]]) for i, robot_id in enumerate(robot_ids)}
+
+        slot_robots = {}
+        for j in range(n_gold_slots):
+            if owner[j] < n:
+                slot_robots.setdefault(slots[j][1], []).append(robot_ids[owner[j]])
+        return slot_robots
+
+    @staticmethod
+    def _bid(benefit, prices, owner, assigned, eps):
+        # One eps phase: release the bidders that no longer satisfy eps-CS,
+        # then bid until every bidder holds a slot
+        held = np.flatnonzero(assigned >= 0)
+        if len(held):
+            values = benefit[held] - prices
+            current = values[np.arange(len(held)), assigned[held]]
+            released = held[current < values.max(axis=1) - eps]
+            owner[assigned[released]] = -1
+            assigned[released] = -1
+
+        unassigned = np.flatnonzero(assigned == -1).tolist()
+        while unassigned:
+            i = unassigned.pop()
+            values = benefit[i] - prices
+            j = int(np.argmax(values))
+            best = values[j]
+            values[j] = -np.inf
+            # A lone slot has no second best; it only has to go up by eps
+            second = values.max() if len(values) > 1 else best
+            prices[j] += best - second + eps
+            previous = owner[j]
+            owner[j] = i
+            assigned[i] = j
+            if previous != -1:
+                assigned[previous] = -1
+                unassigned.append(previous)
+
+class HungarianAllocator:
+    # Min-cost assignment kept square so it can be solved incrementally:
+    # rows are robots plus two phantom rows per gold, columns are two slots
+    # per gold plus one idle slot per robot. Phantoms fill the slots no robot
+    # takes at cost 0. Potentials and the matching are kept between calls;
+    # rows whose robot moved or whose slot disappeared are freed, their
+    # potential is reset to a feasible value, and each is re-augmented with
+    # one shortest-path search instead of solving from scratch.
+    def __init__(self, idle_cost=IDLE_COST):
+        self.idle_cost = idle_cost
+        self.robot_rows = {}  # robot id -> row
+        self.row_robots = {}  # row -> robot id
+        self.robot_coords = {}
+        self.gold_cols = {}   # gold coord -> (col, col)
+        self.phantom_rows = []
+        self.idle_cols = []
+        self.free_row_ids = []
+        self.free_col_ids = []
+        self.n_rows = 0
+        self.n_cols = 0
+        self.augmentations = 0
+        self._allocate_arrays(16)
+
+    def _allocate_arrays(self, capacity):
+        # Row and column arrays grow by doubling; indices of dead rows and
+        # columns are reused before the arrays grow
+        def grown(name, fill, dtype):
+            new = np.full(capacity, fill, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[:len(old)] = old
+            setattr(self, name, new)
+        grown("u", 0.0, np.float64)
+        grown("row_x", 0, np.float64)
+        grown("row_y", 0, np.float64)
+        grown("row_kind", ROBOT, np.int8)
+        grown("row_alive", False, bool)
+        grown("row_col", -1, np.int64)
+        grown("v", 0.0, np.float64)
+        grown("col_x", 0, np.float64)
+        grown("col_y", 0, np.float64)
+        grown("col_kind", GOLD_SLOT, np.int8)
+        grown("col_alive", False, bool)
+        grown("col_row", -1, np.int64)
+        self.capacity = capacity
+
+    def _new_row(self, kind, coord=(0, 0)):
+        if self.free_row_ids:
+            r = self.free_row_ids.pop()
+        else:
+            if self.n_rows == self.capacity:
+                self._allocate_arrays(self.capacity * 2)
+            r = self.n_rows
+            self.n_rows += 1
+        self.row_kind[r] = kind
+        self.row_x[r], self.row_y[r] = coord
+        self.row_alive[r] = True
+        self.row_col[r] = -1
+        return r
+
+    def _new_col(self, kind, coord=(0, 0)):
+        if self.free_col_ids:
+            j = self.free_col_ids.pop()
+        else:
+            if self.n_cols == self.capacity:
+                self._allocate_arrays(self.capacity * 2)
+            j = self.n_cols
+            self.n_cols += 1
+        self.col_kind[j] = kind
+        self.col_x[j], self.col_y[j] = coord
+        self.col_alive[j] = True
+        self.col_row[j] = -1
+        return j
+
+    def _unmatch_row(self, r):
+        j = self.row_col[r]
+        if j != -1:
+            self.col_row[j] = -1
+            self.row_col[r] = -1
+        return j
+
+    def _unmatch_col(self, j):
+        r = self.col_row[j]
+        if r != -1:
+            self.row_col[r] = -1
+            self.col_row[j] = -1
+        return r
+
+    def _kill_row(self, r):
+        self._unmatch_row(r)
+        self.row_alive[r] = False
+        self.free_row_ids.append(r)
+
+    def _kill_col(self, j):
+        self._unmatch_col(j)
+        self.col_alive[j] = False
+        self.free_col_ids.append(j)
+
+    def _cost_row(self, r):
+        m = self.n_cols
+        if self.row_kind[r] == PHANTOM:
+            cost = np.zeros(m)
+        else:
+            cost = np.abs(self.col_x[:m] - self.row_x[r]) + np.abs(self.col_y[:m] - self.row_y[r])
+            cost[self.col_kind[:m] == IDLE_SLOT] = self.idle_cost
+        cost[~self.col_alive[:m]] = np.inf
+        return cost
+
+    def _cost_col(self, j):
+        n = self.n_rows
+        if self.col_kind[j] == IDLE_SLOT:
+            cost = np.full(n, self.idle_cost)
+        else:
+            cost = np.abs(self.row_x[:n] - self.col_x[j]) + np.abs(self.row_y[:n] - self.col_y[j])
+        cost[self.row_kind[:n] == PHANTOM] = 0.0
+        return cost
+
+    def _take_one(self, ids, prefer_free):
+        # Removes an id from ids, preferring one that is already unmatched
+        table = self.row_col if prefer_free == "row" else self.col_row
+        for k, x in enumerate(ids):
+            if table[x] == -1:
+                return ids.pop(k)
+        return ids.pop()
+
+    def allocate(self, robots, golds):
+        return _solve_pairs(self._solve, robots, golds)
+
+    def _solve(self, robots, golds):
+        dirty = set()
+        new_cols = []
+
+        # Robots that left or moved
+        for robot_id in list(self.robot_rows):
+            r = self.robot_rows[robot_id]
+            coord = robots.get(robot_id)
+            if coord is None:
+                del self.robot_rows[robot_id]
+                del self.robot_coords[robot_id]
+                del self.row_robots[r]
+                self._kill_row(r)
+                dirty.discard(r)
+                j = self._take_one(self.idle_cols, "col")
+                freed = self._unmatch_col(j)
+                self._kill_col(j)
+                if freed != -1:
+                    dirty.add(freed)
+            elif coord != self.robot_coords[robot_id]:
+                self.robot_coords[robot_id] = coord
+                self.row_x[r], self.row_y[r] = coord
+                self._unmatch_row(r)
+                dirty.add(r)
+
+        # Gold that is gone
+        wanted = set(golds)
+        for coord in [coord for coord in self.gold_cols if coord not in wanted]:
+            for j in self.gold_cols.pop(coord):
+                freed = self._unmatch_col(j)
+                self._kill_col(j)
+                if freed != -1:
+                    dirty.add(freed)
+            for _ in range(2):
+                r = self._take_one(self.phantom_rows, "row")
+                self._kill_row(r)
+                dirty.discard(r)
+
+        # New robots and gold
+        for robot_id, coord in robots.items():
+            if robot_id not in self.robot_rows:
+                r = self.robot_rows[robot_id] = self._new_row(ROBOT, coord)
+                self.row_robots[r] = robot_id
+                self.robot_coords[robot_id] = coord
+                dirty.add(r)
+                j = self._new_col(IDLE_SLOT)
+                self.idle_cols.append(j)
+                new_cols.append(j)
+        for coord in golds:
+            if coord not in self.gold_cols:
+                cols = self.gold_cols[coord] = (self._new_col(GOLD_SLOT, coord), self._new_col(GOLD_SLOT, coord))
+                new_cols.extend(cols)
+                for _ in range(2):
+                    r = self._new_row(PHANTOM)
+                    self.phantom_rows.append(r)
+                    dirty.add(r)
+
+        # Feasible potentials: new columns against the rows that keep their
+        # potential, then the freed and new rows against every column
+        steady = self.row_alive[:self.n_rows].copy()
+        steady[list(dirty)] = False
+        for j in new_cols:
+            slack = self._cost_col(j) - self.u[:self.n_rows]
+            self.v[j] = slack[steady].min() if steady.any() else 0.0
+        for r in dirty:
+            self.u[r] = (self._cost_row(r) - self.v[:self.n_cols]).min()
+
+        for r in sorted(dirty):
+            self._augment(r)
+
+        slot_robots = {}
+        for coord, cols in self.gold_cols.items():
+            robot_ids = [self.row_robots[r] for r in self.col_row[list(cols)] if r != -1 and self.row_kind[r] == ROBOT]
+            if robot_ids:
+                slot_robots[coord] = robot_ids
+        return slot_robots
+
+    def _augment(self, start_row):
+        # Shortest augmenting path from a free row (Hungarian method, with the
+        # start row playing the part of a virtual column)
+        self.augmentations += 1
+        m = self.n_cols
+        u, v, col_row = self.u, self.v, self.col_row
+        min_slack = np.full(m, np.inf)
+        way = np.full(m, -1)
+        used = np.zeros(m, dtype=bool)
+        visited = []
+        r, j0 = start_row, -1
+        while True:
+            slack = self._cost_row(r) - u[r] - v[:m]
+            better = ~used & (slack < min_slack)
+            min_slack[better] = slack[better]
+            way[better] = j0
+            candidates = np.where(used, np.inf, min_slack)
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+            u[start_row] += delta
+            if visited:
+                cols = np.array(visited)
+                u[col_row[cols]] += delta
+                v[cols] -= delta
+            min_slack[~used] -= delta
+            used[j1] = True
+            visited.append(j1)
+            if col_row[j1] == -1:
+                j0 = j1
+                break
+            r, j0 = col_row[j1], j1
+        while j0 != -1:
+            j1 = way[j0]
+            r = col_row[j1] if j1 != -1 else start_row
+            col_row[j0] = r
+            self.row_col[r] = j0
+            j0 = j1
+
+    def total_cost(self):
+        cost = 0.0
+        for robot_id, r in self.robot_rows.items():
+            j = self.row_col[r]
+            cost += self.idle_cost if self.col_kind[j] == IDLE_SLOT else _distance(self.robot_coords[robot_id], (self.col_x[j], self.col_y[j]))
+        return cost
@@ -0,0 +1,172 @@
+import random
+import numpy as np
+from cell import Cell
+from grid import Grid
+
+NO_TEAM = 0
+TEAM_CODES = {"RED": 1, "BLUE": 2}
+TEAM_NAMES = {1: "RED", 2: "BLUE"}
+
+class ArrayCell:
+    # Lightweight view over one coordinate of an ArrayGrid. It exposes the same
+    # surface as Cell, so Robot and World code does not care which backend it gets
+    __slots__ = ("grid", "coord", "x", "y")
+
+    def __init__(self, grid, coord):
+        self.grid = grid
+        self.coord = coord
+        self.x, self.y = coord
+
+    @property
+    def red_robots(self):
+        robots = self.grid.robots.get(self.coord)
+        return robots[0] if robots else []
+
+    @property
+    def blue_robots(self):
+        robots = self.grid.robots.get(self.coord)
+        return robots[1] if robots else []
+
+    @property
+    def content(self):
+        if self.grid.deposit[self.y, self.x]:
+            return "DepositBox"
+        if self.grid.gold[self.y, self.x] > 0:
+            return "GoldBars"
+        return None
+
+    @property
+    def content_value(self):
+        if self.grid.deposit[self.y, self.x]:
+            return int(self.grid.deposit_score[self.y, self.x])
+        return int(self.grid.gold[self.y, self.x])
+
+    @property
+    def team(self):
+        return TEAM_NAMES.get(int(self.grid.deposit[self.y, self.x]))
+
+    def add_bot(self, robot):
+        self.grid.add_robot(robot, self.coord)
+
+    def remove_bot(self, robot):
+        self.grid.remove_robot(robot, self.coord)
+
+    def get_gold_amount(self):
+        return self.grid.get_gold_amount(self.coord)
+
+    def remove_gold(self):
+        if not self.grid.deposit[self.y, self.x] and self.grid.gold[self.y, self.x] > 0:
+            self.grid.gold[self.y, self.x] -= 1
+
+    def add_gold(self):
+        if self.grid.deposit[self.y, self.x]:
+            self.grid.deposit_score[self.y, self.x] += 1
+        else:
+            self.grid.gold[self.y, self.x] += 1
+
+    def set_deposit_box(self, team):
+        self.grid.deposit[self.y, self.x] = TEAM_CODES[team]
+        self.grid.deposit_score[self.y, self.x] = 0
+        self.grid.gold[self.y, self.x] = 0
+
+    def is_deposit_box(self):
+        return self.team
+
+    def increment_score(self):
+        if self.grid.deposit[self.y, self.x]:
+            self.grid.deposit_score[self.y, self.x] += 1
+
+    render = Cell.render
+    __str__ = Cell.__str__
+
+class ArrayGrid(Grid):
+    # Dense NumPy backend: gold counts, deposit ownership and per-team occupancy
+    # live in (height, width) arrays indexed [y, x]. Robot objects are only kept
+    # for occupied coordinates, since observation needs their ids and facings.
+    def __init__(self, width, height, p_gold, max_gold):
+        self.width = width
+        self.height = height
+        self.gold = np.zeros((height, width), dtype=np.int32)
+        self.deposit = np.zeros((height, width), dtype=np.int8)
+        self.deposit_score = np.zeros((height, width), dtype=np.int32)
+        self.red_count = np.zeros((height, width), dtype=np.int16)
+        self.blue_count = np.zeros((height, width), dtype=np.int16)
+        self.robots = {}
+        self.dirty_coords = None  # set by a renderer, see Grid
+        self.clock = 0
+        self.versions = {}
+
+        # Same draw order as Grid, so a seed produces the same map on either backend
+        for row in range(height):
+            y = height - row - 1
+            for x in range(width):
+                if random.random() < p_gold:
+                    self.gold[y, x] = random.randint(1, max_gold)
+
+    def get_cell(self, coord):
+        x, y = coord
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return ArrayCell(self, coord)
+        return None
+
+    def add_robot(self, robot, coord):
+        x, y = coord
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return
+        robots = self.robots.get(coord)
+        if robots is None:
+            robots = self.robots[coord] = ([], [])
+        if robot.team == "RED":
+            robots[0].append(robot)
+            self.red_count[y, x] += 1
+        else:
+            robots[1].append(robot)
+            self.blue_count[y, x] += 1
+        if self.dirty_coords is not None:
+            self.dirty_coords.add(coord)
+        self.touch(coord)
+
+    def remove_robot(self, robot, coord):
+        robots = self.robots.get(coord)
+        if robots is None:
+            return
+        x, y = coord
+        if robot.team == "RED" and robot in robots[0]:
+            robots[0].remove(robot)
+            self.red_count[y, x] -= 1
+        elif robot.team == "BLUE" and robot in robots[1]:
+            robots[1].remove(robot)
+            self.blue_count[y, x] -= 1
+        if not robots[0] and not robots[1]:
+            del self.robots[coord]
+        if self.dirty_coords is not None:
+            self.dirty_coords.add(coord)
+        self.touch(coord)
+
+    def get_gold_amount(self, coord):
+        x, y = coord
+        if not (0 <= x < self.width and 0 <= y < self.height) or self.deposit[y, x]:
+            return None
+        amount = int(self.gold[y, x])
+        return amount if amount > 0 else None
+
+    def gold_cells(self):
+        ys, xs = np.nonzero((self.gold > 0) & (self.deposit == 0))
+        return [((x, y), int(self.gold[y, x])) for y, x in zip(ys.tolist(), xs.tolist())]
+
+    def get_total_gold(self):
+        return int(self.gold.sum())
+
+    def get_occupancy(self, team=None):
+        if team == "RED":
+            return self.red_count
+        if team == "BLUE":
+            return self.blue_count
+        return self.red_count + self.blue_count
+
+    def get_gold_map(self):
+        return self.gold
+
+    def _rows(self):
+        for y in range(self.height - 1, -1, -1):
+            yield [ArrayCell(self, (x, y)) for x in range(self.width)]
@@ -0,0 +1,95 @@
+import csv
+import json
+import multiprocessing
+import os
+import random
+import time
+from world import World
+
+RESULT_FIELDS = ["episode", "seed", "red_score", "blue_score", "turns", "seconds", "mean_latency"]
+
+def run_episode(episode, seed, config, trace_dir=None, metrics_dir=None):
+    # Every episode owns the global RNG for its whole run, so a seed always
+    # reproduces the same world regardless of which worker picks it up
+    random.seed(seed)
+    start = time.perf_counter()
+    world = World.from_config(config, verbose=False)
+    if trace_dir:
+        world.start_trace(os.path.join(trace_dir, f"episode_{episode}.trace"))
+    if metrics_dir:
+        world.start_metrics(os.path.join(metrics_dir, f"episode_{episode}.metrics"), config.turns,
+                            {"episode": episode, "seed": seed, "config": config.to_dict()})
+    for _ in range(config.turns):
+        world.next_turn()
+    world.stop_trace()
+    world.stop_metrics()
+    latencies = world.consensus_metrics["RED"].latencies + world.consensus_metrics["BLUE"].latencies
+    return {
+        "episode": episode,
+        "seed": seed,
+        "red_score": world.red_score,
+        "blue_score": world.blue_score,
+        "turns": world.turn_count,
+        "seconds": round(time.perf_counter() - start, 4),
+        "mean_latency": round(sum(latencies) / len(latencies), 2) if latencies else None,
+    }
+
+def _run_episode_args(args):
+    return run_episode(*args)
+
+class BatchResult:
+    def __init__(self, episodes):
+        self.episodes = sorted(episodes, key=lambda e: e["episode"])
+
+    def red_scores(self):
+        return [e["red_score"] for e in self.episodes]
+
+    def blue_scores(self):
+        return [e["blue_score"] for e in self.episodes]
+
+    def summary(self):
+        n = len(self.episodes)
+        if n == 0:
+            return {"episodes": 0}
+        red, blue = self.red_scores(), self.blue_scores()
+        return {
+            "episodes": n,
+            "red_mean": sum(red) / n,
+            "blue_mean": sum(blue) / n,
+            "red_wins": sum(1 for r, b in zip(red, blue) if r > b),
+            "blue_wins": sum(1 for r, b in zip(red, blue) if b > r),
+            "draws": sum(1 for r, b in zip(red, blue) if r == b),
+        }
+
+    def table(self):
+        lines = ["{:>7} {:>12} {:>5} {:>5} {:>6} {:>8}".format("EP", "SEED", "RED", "BLUE", "TURNS", "SECONDS")]
+        for e in self.episodes:
+            lines.append("{:>7} {:>12} {:>5} {:>5} {:>6} {:>8.2f}".format(
+                e["episode"], e["seed"], e["red_score"], e["blue_score"], e["turns"], e["seconds"]))
+        s = self.summary()
+        if s["episodes"]:
+            lines.append(f"RED mean: {s['red_mean']:.2f} | BLUE mean: {s['blue_mean']:.2f} | "
+                         f"RED wins: {s['red_wins']} | BLUE wins: {s['blue_wins']} | Draws: {s['draws']}")
+        return "\n".join(lines)
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "episodes": self.episodes}, f, indent=2)
+
+    def to_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.episodes)
+
+def run_batch(n_episodes, config, base_seed=0, workers=None, trace_dir=None, metrics_dir=None):
+    for directory in (trace_dir, metrics_dir):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    jobs = [(i, base_seed + i, config, trace_dir, metrics_dir) for i in range(n_episodes)]
+    if workers == 1:
+        return BatchResult([_run_episode_args(job) for job in jobs])
+
+    with multiprocessing.Pool(processes=workers) as pool:
+        episodes = list(pool.imap_unordered(_run_episode_args, jobs))
+    return BatchResult(episodes)
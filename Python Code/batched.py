@@ -0,0 +1,413 @@
+import argparse
+import random
+import time
+import numpy as np
+from config import MESSAGE_DELAY, SimulationConfig
+from robot_state import FACINGS, FACING_CODES, NONE
+from visibility import FIELD_OF_VIEW, get_visibility_index
+from world import World
+
+# Action codes, the same as the trace format's: WAIT, MOVE, PICK_UP, then one
+# TURN per facing code (TURN_UP, TURN_DOWN, TURN_LEFT, TURN_RIGHT)
+WAIT, MOVE, PICK_UP, TURN = 0, 1, 2, 3
+N_ACTIONS = TURN + len(FACINGS)
+STEP_X = np.array([0, 0, -1, 1], dtype=np.int32)  # per facing code, as Robot.step moves
+STEP_Y = np.array([1, -1, 0, 0], dtype=np.int32)
+# (facing, slot, dx/dy); slot 8 is the robot's own cell
+FOV = np.array([FIELD_OF_VIEW[facing] for facing in FACINGS], dtype=np.int32)
+OWN_CELL = 8
+RED, BLUE = 0, 1
+
+def decode_action(code):
+    # Action code -> the action World and Robot.take_action understand
+    if code == WAIT:
+        return None
+    if code == MOVE:
+        return "MOVE"
+    if code == PICK_UP:
+        return "PICK_UP"
+    return ("TURN", FACINGS[code - TURN])
+
+def world_state(world):
+    # The mechanical state of one World as arrays in BatchedWorld's layout:
+    # robots are red ids 0..N-1 then blue ids, pairs are indices in that order
+    tables = (world.red_team.get_state_table(), world.blue_team.get_state_table())
+    n = len(tables[0])
+    pair = np.concatenate([np.where(table.pair == NONE, NONE, table.pair + team * n)
+                           for team, table in enumerate(tables)])
+    return {
+        "gold": np.asarray(world.grid.get_gold_map(), dtype=np.int16),
+        "deposits": np.array([world.red_deposit_box, world.blue_deposit_box], dtype=np.int32),
+        "x": np.concatenate([table.x for table in tables]),
+        "y": np.concatenate([table.y for table in tables]),
+        "facing": np.concatenate([table.facing for table in tables]),
+        "carrying": np.concatenate([table.carrying for table in tables]),
+        "pair": pair,
+        "scores": np.array([world.red_score, world.blue_score], dtype=np.int32),
+    }
+
+class BatchedWorld:
+    # K independent worlds of the same size and team size, stored as stacked
+    # arrays and stepped together: one NumPy pass per phase covers every world.
+    # Robot axis: red robots 0..N-1, then blue robots N..2N-1. Gold is indexed
+    # [world, y, x] like ArrayGrid.
+    #
+    # A turn follows World with the two-phase pipeline: every robot chooses
+    # from the same observation, then moves and turns are applied, then
+    # pickups, fumbles and deposits are resolved as in check_pickup_logic,
+    # check_fumble and check_drop_deposit. What robots decide is up to a
+    # batched policy (obs, rng) -> (K, 2N) action codes; the Paxos robots are
+    # not part of this engine. Messages are optional fixed-width int payloads
+    # broadcast to teammates with World's random delays.
+    def __init__(self, gold, deposits, x, y, facing, message_delay=MESSAGE_DELAY, message_width=0, seed=None):
+        self.gold = np.array(gold, dtype=np.int16)
+        self.n_worlds, self.height, self.width = self.gold.shape
+        self.deposits = np.array(deposits, dtype=np.int32)  # (K, team, x/y)
+        self.x = np.array(x, dtype=np.int32)
+        self.y = np.array(y, dtype=np.int32)
+        self.facing = np.array(facing, dtype=np.int8)
+        self.n_robots = self.x.shape[1] // 2
+        shape = self.x.shape
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+        self.carrying = np.zeros(shape, dtype=bool)
+        self.pair = np.full(shape, NONE, dtype=np.int32)
+        self.scores = np.zeros((self.n_worlds, 2), dtype=np.int32)
+        self.turn = 0
+        self.rng = np.random.default_rng(seed)
+
+        self.rows = np.arange(shape[1], dtype=np.int32)
+        self.team = (self.rows >= self.n_robots).astype(np.int8)
+        # Own team's deposit box for every robot, (K, 2N)
+        self.own_deposit_x = self.deposits[:, :, 0][:, self.team]
+        self.own_deposit_y = self.deposits[:, :, 1][:, self.team]
+
+        # Delayed messages: a ring of per-turn mailboxes, one slot per
+        # (recipient, sender), indexed by arrival turn modulo the ring length.
+        # A newer message landing on the same turn from the same sender
+        # replaces the older one.
+        self.message_delay = message_delay
+        self.message_width = message_width
+        if message_width:
+            ring = message_delay[1] + 1
+            self.mail = np.zeros((ring, self.n_worlds, shape[1], self.n_robots, message_width), dtype=np.int32)
+            self.mail_valid = np.zeros((ring, self.n_worlds, shape[1], self.n_robots), dtype=bool)
+        self.inbox = np.zeros((self.n_worlds, shape[1], self.n_robots, max(message_width, 1)), dtype=np.int32)
+        self.inbox_valid = np.zeros((self.n_worlds, shape[1], self.n_robots), dtype=bool)
+        self.messages_sent = np.zeros(self.n_worlds, dtype=np.int64)
+
+    @classmethod
+    def random(cls, config, n_worlds, seed=None, message_width=0):
+        # n_worlds fresh maps drawn like World's (gold per cell with
+        # probability p_gold, 1..max_gold bars; two distinct deposit boxes;
+        # robots anywhere, facing anywhere), from NumPy rather than `random`
+        rng = np.random.default_rng(seed)
+        k, h, w, n = n_worlds, config.height, config.width, config.n_robots
+        gold = np.where(rng.random((k, h, w)) < config.p_gold, rng.integers(1, config.max_gold + 1, (k, h, w)), 0)
+        red = rng.integers(0, w * h, k)
+        blue = rng.integers(0, w * h - 1, k)
+        blue += blue >= red
+        deposits = np.stack([np.stack([red % w, red // w], axis=1), np.stack([blue % w, blue // w], axis=1)], axis=1)
+        gold[np.arange(k)[:, None], deposits[:, :, 1], deposits[:, :, 0]] = 0
+        return cls(gold, deposits, rng.integers(0, w, (k, 2 * n)), rng.integers(0, h, (k, 2 * n)),
+                   rng.integers(0, len(FACINGS), (k, 2 * n)), config.message_delay, message_width,
+                   rng.integers(2 ** 63))
+
+    @classmethod
+    def from_worlds(cls, worlds, message_width=0, seed=None):
+        # Batch of the current states of existing Worlds, e.g. ones built from
+        # seeds so both engines start from identical maps
+        states = [world_state(world) for world in worlds]
+        batch = cls(np.stack([s["gold"] for s in states]), np.stack([s["deposits"] for s in states]),
+                    np.stack([s["x"] for s in states]), np.stack([s["y"] for s in states]),
+                    np.stack([s["facing"] for s in states]), worlds[0].message_delay, message_width, seed)
+        batch.carrying[:] = np.stack([s["carrying"] for s in states])
+        batch.pair[:] = np.stack([s["pair"] for s in states])
+        batch.scores[:] = np.stack([s["scores"] for s in states])
+        batch.turn = worlds[0].turn_count
+        return batch
+
+    def state(self, k):
+        # world_state() layout for world k
+        return {"gold": self.gold[k], "deposits": self.deposits[k], "x": self.x[k], "y": self.y[k],
+                "facing": self.facing[k], "carrying": self.carrying[k], "pair": self.pair[k],
+                "scores": self.scores[k]}
+
+    def observe(self):
+        # Everything a policy may look at, as (K, 2N, ...) arrays. The field of
+        # view is World's 9 cells (FIELD_OF_VIEW order, own cell last); slots
+        # off the map have fov_valid False and zero counts.
+        k_count, hw = self.n_worlds, self.height * self.width
+        offsets = FOV[self.facing]
+        fx = self.x[..., None] + offsets[..., 0]
+        fy = self.y[..., None] + offsets[..., 1]
+        valid = (fx >= 0) & (fx < self.width) & (fy >= 0) & (fy < self.height)
+        cells = np.where(valid, fy * self.width + fx, 0)
+
+        gold = np.take_along_axis(self.gold.reshape(k_count, hw), cells.reshape(k_count, -1), axis=1)
+        gold = gold.reshape(cells.shape) * valid
+
+        # Robots per (world, team, cell), looked up for own team and opponents
+        team_base = (np.arange(k_count)[:, None] * 2 + self.team) * hw
+        occupancy = np.bincount((team_base + self.y * self.width + self.x).ravel(), minlength=k_count * 2 * hw)
+        own_base = team_base[..., None]
+        other_base = ((np.arange(k_count)[:, None] * 2 + 1 - self.team) * hw)[..., None]
+        teammates = occupancy[own_base + cells] * valid
+        opponents = occupancy[other_base + cells] * valid
+
+        return {
+            "turn": self.turn,
+            "x": self.x,
+            "y": self.y,
+            "facing": self.facing,
+            "carrying": self.carrying,
+            "pair": self.pair,
+            "team": np.broadcast_to(self.team, self.x.shape),
+            "deposit_x": self.own_deposit_x,
+            "deposit_y": self.own_deposit_y,
+            "fov_x": fx,
+            "fov_y": fy,
+            "fov_valid": valid,
+            "fov_gold": gold,
+            "fov_teammates": teammates,
+            "fov_opponents": opponents,
+            "inbox": self.inbox[..., :self.message_width],
+            "inbox_valid": self.inbox_valid,
+        }
+
+    def step(self, actions, send=None, payload=None):
+        # actions: (K, 2N) action codes. send/payload: optional (K, 2N) mask
+        # and (K, 2N, message_width) messages broadcast to the sender's team.
+        actions = np.asarray(actions)
+        self.turn += 1
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+
+        turning = actions >= TURN
+        self.facing[turning] = actions[turning] - TURN
+        moving = actions == MOVE
+        np.clip(self.x + STEP_X[self.facing] * moving, 0, self.width - 1, out=self.x)
+        np.clip(self.y + STEP_Y[self.facing] * moving, 0, self.height - 1, out=self.y)
+
+        self._resolve_pickups(actions == PICK_UP)
+        self._resolve_fumbles()
+        self._resolve_deposits()
+        if self.message_width:
+            if send is not None:
+                self._send(np.asarray(send, dtype=bool), np.asarray(payload))
+            self._deliver()
+
+    def _resolve_pickups(self, picking):
+        k, r = np.nonzero(picking)
+        if len(k) == 0:
+            return
+        hw = self.height * self.width
+        gold = self.gold.reshape(self.n_worlds, hw)
+        cell = self.y[k, r] * self.width + self.x[k, r]
+        on_gold = gold[k, cell] > 0
+        k, r, cell = k[on_gold], r[on_gold], cell[on_gold]
+        team = self.team[r]
+
+        # A pair is exactly two robots of one team picking up on one cell
+        group = (k.astype(np.int64) * 2 + team) * hw + cell
+        order = np.argsort(group, kind="stable")
+        group, k, r, cell = group[order], k[order], r[order], cell[order]
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        sizes = np.diff(np.r_[starts, len(group)])
+        first = starts[sizes == 2]
+        if len(first) == 0:
+            return
+        k, a, b, cell = k[first], r[first], r[first + 1], cell[first]
+
+        # With a pair of each team on the cell, neither lifts unless there is
+        # gold for both
+        _, inverse, counts = np.unique(k.astype(np.int64) * hw + cell, return_inverse=True, return_counts=True)
+        needed = np.where(counts[inverse] == 2, 2, 1)
+        lifted = (gold[k, cell] >= needed) & ~self.carrying[k, a] & ~self.carrying[k, b]
+        k, a, b, cell = k[lifted], a[lifted], b[lifted], cell[lifted]
+        self.carrying[k, a] = self.carrying[k, b] = True
+        self.pair[k, a] = b
+        self.pair[k, b] = a
+        np.subtract.at(gold, (k, cell), 1)
+
+    def _partner_apart(self):
+        partner = np.where(self.carrying, self.pair, self.rows)
+        px = np.take_along_axis(self.x, partner, axis=1)
+        py = np.take_along_axis(self.y, partner, axis=1)
+        return self.carrying & ((px != self.x) | (py != self.y))
+
+    def _resolve_fumbles(self):
+        # A carrying pair that split drops its gold where the lower-numbered
+        # robot started the turn, as World does for the first of the two it
+        # visits. Gold dropped on a deposit box is lost to the ground.
+        apart = self._partner_apart()
+        if not apart.any():
+            return
+        k, r = np.nonzero(apart & (self.rows < self.pair))
+        gx, gy = self.prev_x[k, r], self.prev_y[k, r]
+        on_deposit = ((self.deposits[k, :, 0] == gx[:, None]) & (self.deposits[k, :, 1] == gy[:, None])).any(axis=1)
+        np.add.at(self.gold, (k[~on_deposit], gy[~on_deposit], gx[~on_deposit]), 1)
+        self.carrying[apart] = False
+        self.pair[apart] = NONE
+
+    def _resolve_deposits(self):
+        # Pairs left carrying stand together; at their own box they score
+        scoring = self.carrying & (self.x == self.own_deposit_x) & (self.y == self.own_deposit_y)
+        if not scoring.any():
+            return
+        leaders = scoring & (self.rows < self.pair)
+        self.scores[:, RED] += leaders[:, :self.n_robots].sum(axis=1, dtype=np.int32)
+        self.scores[:, BLUE] += leaders[:, self.n_robots:].sum(axis=1, dtype=np.int32)
+        self.carrying[scoring] = False
+        self.pair[scoring] = NONE
+
+    def _send(self, send, payload):
+        k, sender = np.nonzero(send)
+        if len(k) == 0:
+            return
+        n = self.n_robots
+        low, high = self.message_delay
+        recipients = (self.team[sender] * n)[:, None] + np.arange(n)
+        slots = (self.turn + self.rng.integers(low, high + 1, recipients.shape)) % len(self.mail)
+        to_others = recipients != sender[:, None]
+        k_all = np.broadcast_to(k[:, None], recipients.shape)[to_others]
+        source = np.broadcast_to((sender % n)[:, None], recipients.shape)[to_others]
+        slots, recipients = slots[to_others], recipients[to_others]
+        self.mail[slots, k_all, recipients, source] = np.broadcast_to(
+            payload[k, sender][:, None, :], to_others.shape + (self.message_width,))[to_others]
+        self.mail_valid[slots, k_all, recipients, source] = True
+        np.add.at(self.messages_sent, k_all, 1)
+
+    def _deliver(self):
+        # Mail arriving next turn becomes the inbox the next observe() shows
+        slot = (self.turn + 1) % len(self.mail)
+        self.inbox[:] = self.mail[slot]
+        self.inbox_valid[:] = self.mail_valid[slot]
+        self.mail_valid[slot] = False
+
+    def run(self, policy, turns, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        for _ in range(turns):
+            self.step(policy(self.observe(), rng))
+        return self.scores
+
+# Batched policies: (observation dict, numpy Generator) -> (K, 2N) action codes
+
+def random_policy(obs, rng):
+    # Robot's exploration move: MOVE half the time, otherwise turn at random
+    shape = obs["x"].shape
+    return np.where(rng.random(shape) < 0.5, MOVE, TURN + rng.integers(0, len(FACINGS), shape)).astype(np.int8)
+
+def _towards(obs, tx, ty):
+    # Facing code that closes the larger gap to (tx, ty) first; robots already
+    # there keep their facing
+    dx, dy = tx - obs["x"], ty - obs["y"]
+    horizontal = np.where(dx < 0, FACING_CODES["LEFT"], FACING_CODES["RIGHT"])
+    vertical = np.where(dy < 0, FACING_CODES["DOWN"], FACING_CODES["UP"])
+    facing = np.where(np.abs(dx) >= np.abs(dy), horizontal, vertical)
+    return np.where((dx == 0) & (dy == 0), obs["facing"], facing)
+
+def greedy_policy(obs, rng):
+    # Carriers head home together, turning until both face the same way.
+    # Others pick up on gold they stand on (a lone robot waits there for a
+    # teammate; a third one walks off), else walk to the nearest gold in view,
+    # else explore.
+    actions = random_policy(obs, rng)
+    x, y, facing = obs["x"], obs["y"], obs["facing"]
+
+    gold = obs["fov_gold"]
+    distance = np.abs(obs["fov_x"] - x[..., None]) + np.abs(obs["fov_y"] - y[..., None])
+    nearest = np.argmin(np.where(gold > 0, distance, np.iinfo(np.int32).max), axis=2)[..., None]
+    sees_gold = (gold > 0).any(axis=2)
+    want = _towards(obs, np.take_along_axis(obs["fov_x"], nearest, axis=2)[..., 0],
+                    np.take_along_axis(obs["fov_y"], nearest, axis=2)[..., 0])
+    actions = np.where(sees_gold, np.where(facing == want, MOVE, TURN + want), actions)
+    on_gold = (gold[..., OWN_CELL] > 0) & (obs["fov_teammates"][..., OWN_CELL] <= 2)
+    actions = np.where(on_gold, PICK_UP, actions)
+
+    carrying = obs["carrying"]
+    home = _towards(obs, obs["deposit_x"], obs["deposit_y"])
+    partner = np.where(carrying, obs["pair"], np.arange(x.shape[1]))
+    partner_facing = np.take_along_axis(facing, partner, axis=1)
+    ready = (facing == home) & (partner_facing == home)
+    actions = np.where(carrying, np.where(ready, MOVE, TURN + home), actions)
+    return actions.astype(np.int8)
+
+def noisy_policy(obs, rng, noise=0.2):
+    # greedy_policy with a fraction of actions replaced by any action at all,
+    # so carrying pairs also split up and fumble
+    actions = greedy_policy(obs, rng)
+    shape = actions.shape
+    return np.where(rng.random(shape) < noise, rng.integers(0, N_ACTIONS, shape), actions).astype(np.int8)
+
+POLICIES = {"random": random_policy, "greedy": greedy_policy, "noisy": noisy_policy}
+
+def compare_state(batch, k, world):
+    # First difference between world k of the batch and a World, or None.
+    # Also checks that the batch's field of view shows the same gold as the
+    # world's visibility index.
+    expected = world_state(world)
+    actual = batch.state(k)
+    for name, values in expected.items():
+        if not np.array_equal(values, actual[name]):
+            return f"{name} differs"
+    obs = batch.observe()
+    index = get_visibility_index(world.width, world.height)
+    for i, robot in enumerate(world.red_team.get_robots() + world.blue_team.get_robots()):
+        cells = index.get(robot.current_coord, robot.facing)
+        valid = obs["fov_valid"][k, i]
+        seen = list(zip(obs["fov_x"][k, i][valid].tolist(), obs["fov_y"][k, i][valid].tolist()))
+        if seen != list(cells):
+            return f"field of view of robot {i} differs"
+        if obs["fov_gold"][k, i][valid].tolist() != [world.grid.get_gold_amount(c) or 0 for c in cells]:
+            return f"gold in view of robot {i} differs"
+    return None
+
+def validate(config, seeds, turns, policy=noisy_policy, policy_seed=0):
+    # Drives seeded Worlds (through World.step_actions) and a batch built from
+    # them with the same actions, comparing state after every turn. Returns
+    # None when they agree throughout, else where they first diverged.
+    worlds = []
+    for seed in seeds:
+        random.seed(seed)
+        worlds.append(World.from_config(config, verbose=False))
+    batch = BatchedWorld.from_worlds(worlds)
+    rng = np.random.default_rng(policy_seed)
+    for turn in range(1, turns + 1):
+        actions = policy(batch.observe(), rng)
+        batch.step(actions)
+        for k, world in enumerate(worlds):
+            world.step_actions([decode_action(code) for code in actions[k].tolist()])
+            difference = compare_state(batch, k, world)
+            if difference:
+                return f"turn {turn}, seed {seeds[k]}: {difference}"
+    return None
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Step many worlds at once with a batched policy")
+    parser.add_argument("--worlds", type=int, default=256)
+    parser.add_argument("--turns", type=int, default=None, help="turns per world (default: config default)")
+    parser.add_argument("--policy", choices=POLICIES, default="greedy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--validate", type=int, default=0, metavar="N",
+                        help="first check N seeded worlds against World turn by turn")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    config = SimulationConfig()
+    turns = args.turns or config.turns
+    policy = POLICIES[args.policy]
+    if args.validate:
+        difference = validate(config, list(range(args.seed, args.seed + args.validate)), min(turns, 500))
+        print(f"Validation against World: {difference or 'identical'}")
+    batch = BatchedWorld.random(config, args.worlds, args.seed)
+    start = time.perf_counter()
+    scores = batch.run(policy, turns, np.random.default_rng(args.seed))
+    seconds = time.perf_counter() - start
+    print(f"{args.worlds} worlds x {turns} turns in {seconds:.2f}s "
+          f"({args.worlds * turns / seconds:,.0f} world-turns/s)")
+    print(f"Mean score RED {scores[:, RED].mean():.2f} | BLUE {scores[:, BLUE].mean():.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import heapq
+from array import array
+import numpy as np
+from sparse_grid import CHUNK_SIZE
+
+NEVER = -1  # observation turn of a cell that was never seen
+
+class BeliefChunk:
+    # Flat row-major arrays for one CHUNK_SIZE square of the map (smaller at
+    # the right and top edges). array.array rather than NumPy: a robot writes
+    # 9 single cells a turn, and scalar access is much cheaper here.
+    __slots__ = ("width", "gold", "seen")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.gold = array("h", bytes(2 * width * height))
+        self.seen = array("i", [NEVER]) * (width * height)
+
+class BeliefMap:
+    # What one robot remembers of the map: the gold it last saw in each cell
+    # and the turn it saw it. Chunks are allocated the first time a cell in
+    # them is seen, so large maps only cost what was explored. known_gold holds
+    # every coord last seen with gold, in the order it was first seen, so
+    # proposals never rescan the arrays. gold_chunks buckets the same coords
+    # by chunk so nearest-first queries only open the chunks they need.
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.chunks = {}       # (x // CHUNK_SIZE, y // CHUNK_SIZE) -> BeliefChunk
+        self.known_gold = {}   # coord -> amount last seen
+        self.gold_chunks = {}  # chunk key -> {coord: sighting number}
+        self.sightings = 0
+
+    def _chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = BeliefChunk(min(CHUNK_SIZE, self.width - key[0] * CHUNK_SIZE),
+                                                   min(CHUNK_SIZE, self.height - key[1] * CHUNK_SIZE))
+        return chunk
+
+    def observe(self, turn, gold_seen):
+        # gold_seen: {coord: amount} for the cells in view this turn. They are
+        # almost always in one chunk, so the last chunk is reused.
+        known_gold = self.known_gold
+        chunk_key = chunk = None
+        for coord, amount in gold_seen.items():
+            x, y = coord
+            key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+            if key != chunk_key:
+                chunk_key = key
+                chunk = self._chunk(key)
+            i = (y % CHUNK_SIZE) * chunk.width + x % CHUNK_SIZE
+            chunk.gold[i] = amount
+            chunk.seen[i] = turn
+            if amount:
+                if coord not in known_gold:
+                    bucket = self.gold_chunks.get(key)
+                    if bucket is None:
+                        bucket = self.gold_chunks[key] = {}
+                    bucket[coord] = self.sightings
+                    self.sightings += 1
+                known_gold[coord] = amount
+            elif coord in known_gold:
+                del known_gold[coord]
+                bucket = self.gold_chunks[key]
+                del bucket[coord]
+                if not bucket:
+                    del self.gold_chunks[key]
+
+    def refresh(self, turn, coords):
+        # The cells in coords were seen again with nothing changed in them
+        chunk_key = chunk = None
+        for x, y in coords:
+            key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+            if key != chunk_key:
+                chunk_key = key
+                chunk = self._chunk(key)
+            chunk.seen[(y % CHUNK_SIZE) * chunk.width + x % CHUNK_SIZE] = turn
+
+    def gold_at(self, coord):
+        return self.known_gold.get(coord, 0)
+
+    def last_seen(self, coord):
+        x, y = coord
+        chunk = self.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        if chunk is None:
+            return NEVER
+        return chunk.seen[(y % CHUNK_SIZE) * chunk.width + x % CHUNK_SIZE]
+
+    def gold_by_distance(self, coord, seen_since=NEVER):
+        # Yields known gold coords last seen at or after seen_since, nearest
+        # (Manhattan) first; ties keep sighting order. Chunks are opened in
+        # order of their distance from coord, and a gold is yielded once no
+        # unopened chunk can hold one as near, so a caller that stops early
+        # never touches the gold further out.
+        x, y = coord
+        chunks = []
+        for cx, cy in self.gold_chunks:
+            left, bottom = cx * CHUNK_SIZE, cy * CHUNK_SIZE
+            dx = max(left - x, 0, x - (left + CHUNK_SIZE - 1))
+            dy = max(bottom - y, 0, y - (bottom + CHUNK_SIZE - 1))
+            chunks.append((dx + dy, cx, cy))
+        heapq.heapify(chunks)
+        golds = []  # (distance, sighting number, coord) from opened chunks
+        while chunks or golds:
+            while chunks and (not golds or chunks[0][0] <= golds[0][0]):
+                _, cx, cy = heapq.heappop(chunks)
+                for (gx, gy), sighting in self.gold_chunks[cx, cy].items():
+                    heapq.heappush(golds, (abs(gx - x) + abs(gy - y), sighting, (gx, gy)))
+            _, _, gold = heapq.heappop(golds)
+            if seen_since == NEVER or self.last_seen(gold) >= seen_since:
+                yield gold
+
+    def _dense(self, field, dtype, fill):
+        dense = np.full((self.height, self.width), fill, dtype=dtype)
+        for (cx, cy), chunk in self.chunks.items():
+            values = np.frombuffer(getattr(chunk, field), dtype=dtype).reshape(-1, chunk.width)
+            h, w = values.shape
+            dense[cy * CHUNK_SIZE:cy * CHUNK_SIZE + h, cx * CHUNK_SIZE:cx * CHUNK_SIZE + w] = values
+        return dense
+
+    def gold_array(self):
+        # Dense (height, width) copies, indexed [y, x], for inspection
+        return self._dense("gold", np.int16, 0)
+
+    def seen_array(self):
+        return self._dense("seen", np.int32, NEVER)
+
+    def explored_count(self):
+        return sum(len(chunk.seen) - chunk.seen.count(NEVER) for chunk in self.chunks.values())
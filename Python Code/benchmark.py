@@ -0,0 +1,216 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from world import World
+from grid import Grid
+from sparse_grid import SparseGrid
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# A case fails when its turns/sec drops by more than this fraction of the baseline
+THRESHOLD = 0.25
+SEED = 1234
+
+# Full matrix axes. Cases that would put more robots than a quarter of the
+# cells on the map are skipped.
+GRID_SIZES = (20, 100, 1000)
+TEAM_SIZES = (10, 100, 500)
+GOLD_DENSITIES = (0.02, 0.1)
+DELAYS = ((1, 1), (1, 5), (1, 10))
+# Fewer turns for bigger teams keeps every case within a few seconds
+TURNS_BY_TEAM = {10: 400, 100: 60, 500: 10}
+# Grids at least this wide use SparseGrid, like large maps should
+SPARSE_MIN_SIZE = 500
+
+def case(size, n_robots, p_gold, delay, turns=None):
+    return {
+        "name": f"grid{size}_team{n_robots}_gold{p_gold}_delay{delay[0]}-{delay[1]}",
+        "size": size,
+        "n_robots": n_robots,
+        "p_gold": p_gold,
+        "max_gold": 3,
+        "delay": list(delay),
+        "turns": turns or TURNS_BY_TEAM[n_robots],
+    }
+
+# The quick suite covers every axis once around the default game (20x20,
+# 10 robots a team, 0.1 gold, 1-5 turn delays)
+QUICK = [
+    case(20, 10, 0.1, (1, 5)),
+    case(20, 10, 0.02, (1, 5)),
+    case(20, 10, 0.1, (1, 1)),
+    case(20, 10, 0.1, (1, 10)),
+    case(100, 10, 0.1, (1, 5)),
+    case(100, 100, 0.1, (1, 5)),
+    case(1000, 100, 0.02, (1, 5)),
+    case(1000, 500, 0.02, (1, 5)),
+]
+
+# Team size alone on one map, to see how per-turn cost grows with robots
+SCALING = [case(200, n_robots, 0.1, (1, 5), turns) for n_robots, turns in ((10, 400), (50, 150), (100, 60), (500, 10))]
+
+def full_matrix():
+    return [case(size, n_robots, p_gold, delay)
+            for size, n_robots, p_gold, delay in itertools.product(GRID_SIZES, TEAM_SIZES, GOLD_DENSITIES, DELAYS)
+            if 2 * n_robots <= size * size // 4]
+
+SUITES = {"quick": lambda: QUICK, "scaling": lambda: SCALING, "full": full_matrix}
+
+def make_world(spec):
+    random.seed(SEED)
+    grid_class = SparseGrid if spec["size"] >= SPARSE_MIN_SIZE else Grid
+    return World(spec["size"], spec["size"], spec["p_gold"], spec["max_gold"], spec["n_robots"], verbose=False,
+                 grid_class=grid_class, message_delay=tuple(spec["delay"]))
+
+def run_case(spec, repeat=3):
+    # Throughput is the best of `repeat` timed runs. Peak memory comes from a
+    # separate run under tracemalloc, which would otherwise skew the timing.
+    best = None
+    for _ in range(repeat):
+        world = make_world(spec)
+        start = time.perf_counter()
+        for _ in range(spec["turns"]):
+            world.next_turn()
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    messages = world.red_message_queue.scheduled_count + world.blue_message_queue.scheduled_count
+
+    tracemalloc.start()
+    world = make_world(spec)
+    for _ in range(spec["turns"]):
+        world.next_turn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "turns_per_sec": round(spec["turns"] / best, 2),
+        "peak_mb": round(peak / 2 ** 20, 2),
+        "messages_per_turn": round(messages / spec["turns"], 2),
+        "score": world.red_score + world.blue_score,
+    }
+
+def run_suite(cases, repeat=3, log=print):
+    results = {}
+    for spec in cases:
+        results[spec["name"]] = dict(spec, **run_case(spec, repeat))
+        r = results[spec["name"]]
+        log(f"{spec['name']:<42} {r['turns_per_sec']:>10.1f} turns/s {r['peak_mb']:>9.2f} MB "
+            f"{r['messages_per_turn']:>9.1f} msg/turn")
+    return results
+
+def compare(results, baseline, threshold=THRESHOLD):
+    # Returns (report lines, regressed case names). Cases missing from either
+    # side are reported but never fail the run.
+    lines = []
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"{name:<42} no baseline")
+            continue
+        ratio = result["turns_per_sec"] / base["turns_per_sec"]
+        status = "ok"
+        if ratio < 1 - threshold:
+            status = "REGRESSED"
+            regressions.append(name)
+        notes = []
+        if result["messages_per_turn"] != base["messages_per_turn"] or result["score"] != base["score"]:
+            # Same seed, different traffic or score: the simulation itself changed
+            notes.append("behaviour changed")
+        if result["peak_mb"] > base["peak_mb"] * (1 + threshold):
+            notes.append(f"memory {base['peak_mb']:.2f} -> {result['peak_mb']:.2f} MB")
+        lines.append(f"{name:<42} {ratio:>6.2f}x {status:<9} {', '.join(notes)}")
+    return lines, regressions
+
+def git_commit():
+    # Commit the code was measured at; "-dirty" when it had local changes
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=os.path.dirname(BASELINE_PATH),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(path, results, suite):
+    # Built before the file is opened, which would otherwise count as a change
+    baseline = {
+        "suite": suite,
+        "seed": SEED,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "host": platform.node(),
+        "cpu": cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "cases": results,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+def describe_baseline(baseline):
+    # Timings only compare on the machine they were recorded on, and a
+    # baseline from an old commit hides any speedup made since
+    return (f"Baseline recorded at commit {baseline.get('commit') or 'unknown'} on "
+            f"{baseline.get('host') or 'unknown host'} ({baseline.get('cpu') or baseline.get('machine', 'unknown cpu')}, "
+            f"Python {baseline.get('python', '?')})")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure World throughput, memory and message traffic")
+    parser.add_argument("--suite", choices=SUITES, default="quick")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best one counts)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="fail when turns/sec drops by more than this fraction of the baseline")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    cases = SUITES[args.suite]()
+    if args.only:
+        cases = [spec for spec in cases if args.only in spec["name"]]
+    results = run_suite(cases, args.repeat)
+    if args.json:
+        save_baseline(args.json, results, args.suite)
+    if args.save:
+        save_baseline(args.baseline, results, args.suite)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save to create one")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    lines, regressions = compare(results, baseline["cases"], args.threshold)
+    print()
+    print(describe_baseline(baseline))
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,12 @@
 import random
 
+# ANSI color codes
+RED = '\033[91m'
+BLUE = '\033[94m'
+YELLOW = '\033[93m'
+GREEN = '\033[92m'
+RESET = '\033[0m'
+
 class Cell:
     def __init__(self, coord, p_gold, max_gold):
         self.coord = coord
@@ -9,7 +16,9 @@ class Cell:
         self.content_value = 0
         self.team = None
 
-        contain_gold = random.random() < p_gold
+        # No draw when gold is off, so grids that place gold themselves can
+        # create empty cells without touching the RNG
+        contain_gold = p_gold and random.random() < p_gold
         if contain_gold:
             self.content = "GoldBars"
             self.content_value = random.randint(1, max_gold)
@@ -62,43 +71,48 @@ class Cell:
         if self.content == "DepositBox":
             self.content_value += 1
 
-    def __str__(self):
-        # ANSI color codes
-        RED = '\033[91m'
-        BLUE = '\033[94m'
-        YELLOW = '\033[93m'
-        GREEN = '\033[92m'
-        RESET = '\033[0m'
-
+    def render(self):
+        # Returns the colored text and its on-screen width, so callers can pad
+        # cells without stripping the ANSI codes back out
         parts = []
+        width = 0
 
         if self.content == "GoldBars" and self.content_value > 0:
             gold_str = f"G{self.content_value if self.content_value > 1 else ''}"
             parts.append(f"{YELLOW}{gold_str}{RESET}")
+            width += len(gold_str)
         elif self.content == "DepositBox":
             team_char = self.team[0]
             if self.team == "RED":
                 parts.append(f"{RED}D{team_char}{RESET}")
             else:
                 parts.append(f"{BLUE}D{team_char}{RESET}")
+            width += 2
 
         if self.red_robots:
             carrying_gold = any(r.is_carrying for r in self.red_robots)
             count = len(self.red_robots)
             red_str = f"R{count if count > 1 else ''}"
+            width += len(red_str)
             if carrying_gold:
                 red_str += f"({GREEN}G{RED})"
+                width += 3
             parts.append(f"{RED}{red_str}{RESET}")
 
         if self.blue_robots:
             carrying_gold = any(r.is_carrying for r in self.blue_robots)
             count = len(self.blue_robots)
             blue_str = f"B{count if count > 1 else ''}"
+            width += len(blue_str)
             if carrying_gold:
                 blue_str += f"({GREEN}G{BLUE})"
+                width += 3
             parts.append(f"{BLUE}{blue_str}{RESET}")
 
         if not parts:
-            return "."
+            return ".", 1
         else:
-            return ",".join(parts)
\ No newline at end of file
+            return ",".join(parts), width + len(parts) - 1
+
+    def __str__(self):
+        return self.render()[0]
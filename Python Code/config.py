@@ -0,0 +1,62 @@
+import dataclasses
+import hashlib
+import json
+from dataclasses import dataclass
+
+# Inclusive range of turns a message spends in flight
+MESSAGE_DELAY = (1, 5)
+
+@dataclass(frozen=True)
+class RobotTimeouts:
+    # Per-robot timers, in turns
+    paxos: int = 10               # a non-IDLE Paxos role is dropped after this many turns
+    stuck_pickup: int = 20        # consecutive PICK_UPs before a robot gives up and resets
+    partner_wait: int = 30        # a HELPER at its gold waits this long for its partner
+    proposal_cooldown: int = 5    # a robot proposes again only after more than this many turns
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    # Everything that shapes a run, so it can be swept, hashed and replayed
+    width: int = 20
+    height: int = 20
+    p_gold: float = 0.1
+    max_gold: int = 3
+    n_robots: int = 10
+    turns: int = 2500
+    message_delay: tuple = MESSAGE_DELAY
+    timeouts: RobotTimeouts = RobotTimeouts()
+    consensus: str = "paxos"
+    allocation: str = None
+    pipeline: str = "sequential"
+
+    def replace(self, **changes):
+        # Field names of RobotTimeouts can be passed directly
+        timeout_changes = {name: changes.pop(name) for name in list(changes) if name in TIMEOUT_FIELDS}
+        if timeout_changes:
+            changes["timeouts"] = dataclasses.replace(changes.get("timeouts", self.timeouts), **timeout_changes)
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self):
+        values = dataclasses.asdict(self)
+        values["message_delay"] = list(self.message_delay)
+        return values
+
+    @classmethod
+    def from_dict(cls, values):
+        values = dict(values)
+        if "message_delay" in values:
+            values["message_delay"] = tuple(values["message_delay"])
+        if isinstance(values.get("timeouts"), dict):
+            values["timeouts"] = RobotTimeouts(**values["timeouts"])
+        return cls(**values)
+
+    def key(self, seed, code_version=""):
+        # Content address of one run: same config, seed and code give the same
+        # key, so a result stored under it can be reused instead of re-simulated
+        payload = json.dumps({"config": self.to_dict(), "seed": seed, "code": code_version}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+TIMEOUT_FIELDS = tuple(field.name for field in dataclasses.fields(RobotTimeouts))
+# Names accepted by SimulationConfig.replace and the sweep engine
+TUNABLE_FIELDS = tuple(field.name for field in dataclasses.fields(SimulationConfig) if field.name != "timeouts") \
+    + TIMEOUT_FIELDS
@@ -0,0 +1,72 @@
+CONSENSUS_MODES = ("paxos", "multi_paxos")
+
+# Multi-Paxos timing, in turns. Message delays are 1-5 turns, so a lease has
+# to outlast a heartbeat interval plus the longest delay.
+HEARTBEAT_INTERVAL = 5
+LEASE_TURNS = 15
+# How long the leader treats gold and robots it assigned as taken
+ASSIGNMENT_TTL = 40
+# Assignments only one robot of the pair adopted are forgotten past this many
+PENDING_ADOPTION_LIMIT = 1000
+
+COUNTERS = ("rounds", "failed_rounds", "timeouts", "elections", "requests")
+
+class ConsensusMetrics:
+    # Per-team consensus counters, shared by the team's robots. Latency is the
+    # number of turns from a robot sighting gold until both robots of the pair
+    # assigned to it have adopted the assignment.
+    def __init__(self):
+        self.rounds = 0          # PREPARE rounds (Paxos), batched ACCEPTs and elections (Multi-Paxos)
+        self.failed_rounds = 0   # rounds the starting robot gave up on
+        self.timeouts = 0        # robots reset by the consensus timer, in any role
+        self.elections = 0
+        self.requests = 0
+        self.latencies = []
+        self.pending = {}        # (coord, pair, start turn) -> pair members that adopted it
+
+    def record_adoption(self, key, start_turn, turn):
+        count = self.pending.pop(key, 0) + 1
+        if count == 2:
+            self.latencies.append(turn - start_turn)
+            return
+        self.pending[key] = count
+        if len(self.pending) > PENDING_ADOPTION_LIMIT:
+            cutoff = turn - ASSIGNMENT_TTL
+            self.pending = {k: v for k, v in self.pending.items() if k[2] >= cutoff}
+
+    def merge(self, tally):
+        # Folds in what one robot recorded in a ConsensusTally. Adoptions are
+        # replayed in the order given, so merging tallies in robot order gives
+        # the same result as recording directly.
+        for name in COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(tally, name))
+        for key, start_turn, turn in tally.adoptions:
+            self.record_adoption(key, start_turn, turn)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        n = len(latencies)
+        return {
+            "rounds": self.rounds,
+            "failed_rounds": self.failed_rounds,
+            "timeouts": self.timeouts,
+            "elections": self.elections,
+            "requests": self.requests,
+            "assignments": n,
+            "mean_latency": sum(latencies) / n if n else None,
+            "p90_latency": latencies[min(n - 1, int(n * 0.9))] if n else None,
+        }
+
+class ConsensusTally:
+    # Private stand-in for the team's ConsensusMetrics while a robot decides on
+    # a worker thread. It only records; the main thread merges it afterwards.
+    def __init__(self):
+        self.rounds = 0
+        self.failed_rounds = 0
+        self.timeouts = 0
+        self.elections = 0
+        self.requests = 0
+        self.adoptions = []      # (key, start turn, turn) in the order recorded
+
+    def record_adoption(self, key, start_turn, turn):
+        self.adoptions.append((key, start_turn, turn))
@@ -0,0 +1,279 @@
+import argparse
+import random
+import time
+import numpy as np
+from batched import FOV, N_ACTIONS, POLICIES, decode_action
+from config import SimulationConfig
+from messages import Signal, SIGNAL
+from robot_state import NONE
+from world import World
+
+# Action code -> World action, so stepping never decodes
+ACTION_TABLE = tuple(decode_action(code) for code in range(N_ACTIONS))
+FOV_DX = np.ascontiguousarray(FOV[..., 0])  # (facing, slot)
+FOV_DY = np.ascontiguousarray(FOV[..., 1])
+
+def observation_buffers(shape, n_robots, message_width):
+    # Observation arrays for robots laid out as `shape`: (2N,) for one env,
+    # (n_envs, 2N) for many. Keys and layout match BatchedWorld.observe, so
+    # its batched policies run on these too.
+    fov = shape + (len(FOV[0]),)
+    return {
+        "x": np.zeros(shape, dtype=np.int32),
+        "y": np.zeros(shape, dtype=np.int32),
+        "facing": np.zeros(shape, dtype=np.int8),
+        "carrying": np.zeros(shape, dtype=bool),
+        "pair": np.full(shape, NONE, dtype=np.int32),
+        "team": np.zeros(shape, dtype=np.int8),
+        "deposit_x": np.zeros(shape, dtype=np.int32),
+        "deposit_y": np.zeros(shape, dtype=np.int32),
+        "fov_x": np.zeros(fov, dtype=np.int32),
+        "fov_y": np.zeros(fov, dtype=np.int32),
+        "fov_valid": np.zeros(fov, dtype=bool),
+        "fov_gold": np.zeros(fov, dtype=np.int16),
+        "fov_teammates": np.zeros(fov, dtype=np.int16),
+        "fov_opponents": np.zeros(fov, dtype=np.int16),
+        "inbox": np.zeros(shape + (n_robots, message_width), dtype=np.int32),
+        "inbox_valid": np.zeros(shape + (n_robots,), dtype=bool),
+    }
+
+class GoldEnv:
+    # Gym-style reset()/step(actions) around one World, for policies trained
+    # outside the simulation. Actions are batched.py's codes, one per robot
+    # (red ids, then blue ids); each robot is rewarded its team's gold scored
+    # that turn. Observations are the robot's own state, its 9-cell field of
+    # view (as _get_observable_cells sees it, own cell last) and the latest
+    # signal from each teammate that arrived for the coming turn.
+    #
+    # All arrays are allocated once: step() rewrites obs and rewards in place
+    # and returns the same objects, so copy them to keep an old observation.
+    # The world keeps a dense mirror of ground gold and per-team robot counts,
+    # refreshed only where robots were and are, so the field of view is a
+    # few NumPy gathers into those buffers.
+    def __init__(self, config=SimulationConfig(), message_width=0, max_turns=None, buffers=None, rewards=None,
+                 **world_kwargs):
+        self.config = config
+        self.message_width = message_width
+        self.max_turns = max_turns or config.turns
+        self.world_kwargs = world_kwargs
+        self.world = None
+        n = self.n_robots = config.n_robots
+        hw = config.width * config.height
+
+        self.obs = buffers if buffers is not None else observation_buffers((2 * n,), n, message_width)
+        self.rewards = rewards if rewards is not None else np.zeros(2 * n, dtype=np.float32)
+        self.obs["team"][n:] = 1
+        self.info = {"turn": 0, "red_score": 0, "blue_score": 0}
+
+        self._gold = np.zeros(hw, dtype=np.int16)
+        self._occupancy = np.zeros(2 * hw, dtype=np.int16)  # robots per (team, cell)
+        team = self.obs["team"].astype(np.int32)
+        self._own_offset = (team * hw)[:, None]
+        self._other_offset = ((1 - team) * hw)[:, None]
+        self._cells = np.zeros(self.obs["fov_x"].shape, dtype=np.int32)
+        self._index = np.zeros(self.obs["fov_x"].shape, dtype=np.int32)
+        self._mask = np.zeros(self.obs["fov_x"].shape, dtype=bool)
+        self._pair_mask = np.zeros(n, dtype=bool)
+        self._offsets = self._own_offset[:, 0].tolist()
+        self._actions = [None] * (2 * n)
+        self._signals = [None] * (2 * n)
+
+    def reset(self, seed=None):
+        # A fresh World; seed reseeds the global RNG it is built from
+        if seed is not None:
+            random.seed(seed)
+        if self.world is not None:
+            self.world.close()
+        world = self.world = World.from_config(self.config, verbose=False, **self.world_kwargs)
+        self.robots = world.red_team.get_robots() + world.blue_team.get_robots()
+        width = self.config.width
+
+        self._gold[:] = np.asarray(world.grid.get_gold_map(), dtype=np.int16).ravel()
+        self._occupancy.fill(0)
+        for robot, offset in zip(self.robots, self._offsets):
+            x, y = robot.current_coord
+            self._occupancy[offset + y * width + x] += 1
+        n = self.n_robots
+        (red_x, red_y), (blue_x, blue_y) = world.red_deposit_box, world.blue_deposit_box
+        self.obs["deposit_x"][:n], self.obs["deposit_y"][:n] = red_x, red_y
+        self.obs["deposit_x"][n:], self.obs["deposit_y"][n:] = blue_x, blue_y
+        self.obs["inbox"].fill(0)
+        self.obs["inbox_valid"].fill(False)
+        self.rewards.fill(0)
+        self._update_info()
+        self._write_observation()
+        return self.obs, self.info
+
+    def step(self, actions, messages=None, send=None):
+        # actions: 2N action codes. send/messages: optional per-robot flags and
+        # (2N, message_width) payloads broadcast to the sender's team.
+        # Returns (obs, rewards, terminated, truncated, info); terminated once
+        # no gold is left on the ground or being carried.
+        world = self.world
+        robots = self.robots
+        for i, code in enumerate(actions):
+            self._actions[i] = ACTION_TABLE[code]
+        signals = None
+        if send is not None:
+            signals = self._signals
+            for i, flag in enumerate(send):
+                signals[i] = Signal(robots[i].id, tuple(messages[i].tolist())) if flag else None
+        red_score, blue_score = world.red_score, world.blue_score
+
+        world.step_actions(self._actions, signals)
+
+        # Gold only changes where robots stand (pickups) or stood (fumbles)
+        grid, gold, occupancy = world.grid, self._gold, self._occupancy
+        width = self.config.width
+        for robot, offset in zip(robots, self._offsets):
+            (x, y), (px, py) = robot.current_coord, robot.previous_coord
+            if (x, y) != (px, py):
+                occupancy[offset + py * width + px] -= 1
+                occupancy[offset + y * width + x] += 1
+                gold[py * width + px] = grid.get_gold_amount((px, py)) or 0
+            gold[y * width + x] = grid.get_gold_amount((x, y)) or 0
+
+        n = self.n_robots
+        self.rewards[:n] = world.red_score - red_score
+        self.rewards[n:] = world.blue_score - blue_score
+        self._update_info()
+        self._write_observation()
+        terminated = not gold.any() and not self.obs["carrying"].any()
+        truncated = world.turn_count >= self.max_turns
+        return self.obs, self.rewards, terminated, truncated, self.info
+
+    def _update_info(self):
+        self.info["turn"] = self.world.turn_count
+        self.info["red_score"] = self.world.red_score
+        self.info["blue_score"] = self.world.blue_score
+
+    def _write_observation(self):
+        obs = self.obs
+        n = self.n_robots
+        tables = (self.world.red_team.get_state_table(), self.world.blue_team.get_state_table())
+        for team, table in enumerate(tables):
+            rows = slice(team * n, (team + 1) * n)
+            obs["x"][rows] = table.x
+            obs["y"][rows] = table.y
+            obs["facing"][rows] = table.facing
+            obs["carrying"][rows] = table.carrying
+            pair = obs["pair"][rows]
+            pair[:] = table.pair
+            np.greater_equal(table.pair, 0, out=self._pair_mask)
+            np.add(pair, team * n, out=pair, where=self._pair_mask)
+
+        # Field of view, with off-map slots pointed at cell 0 and zeroed after
+        fov_x, fov_y, valid = obs["fov_x"], obs["fov_y"], obs["fov_valid"]
+        cells, index, mask = self._cells, self._index, self._mask
+        np.take(FOV_DX, obs["facing"], axis=0, out=fov_x, mode="clip")
+        np.add(fov_x, obs["x"][:, None], out=fov_x)
+        np.take(FOV_DY, obs["facing"], axis=0, out=fov_y, mode="clip")
+        np.add(fov_y, obs["y"][:, None], out=fov_y)
+        np.greater_equal(fov_x, 0, out=valid)
+        np.less(fov_x, self.config.width, out=mask)
+        valid &= mask
+        np.greater_equal(fov_y, 0, out=mask)
+        valid &= mask
+        np.less(fov_y, self.config.height, out=mask)
+        valid &= mask
+        np.multiply(fov_y, self.config.width, out=cells)
+        cells += fov_x
+        np.logical_not(valid, out=mask)
+        np.copyto(cells, 0, where=mask)
+
+        np.take(self._gold, cells, out=obs["fov_gold"], mode="clip")
+        obs["fov_gold"] *= valid
+        np.add(cells, self._own_offset, out=index)
+        np.take(self._occupancy, index, out=obs["fov_teammates"], mode="clip")
+        obs["fov_teammates"] *= valid
+        np.add(cells, self._other_offset, out=index)
+        np.take(self._occupancy, index, out=obs["fov_opponents"], mode="clip")
+        obs["fov_opponents"] *= valid
+
+        inbox, inbox_valid = obs["inbox"], obs["inbox_valid"]
+        inbox_valid.fill(False)
+        for i, robot in enumerate(self.robots):
+            if robot.status_inbox:
+                for payload in robot.status_inbox:
+                    if payload.kind == SIGNAL:
+                        inbox[i, payload.sender_id] = payload.values
+                        inbox_valid[i, payload.sender_id] = True
+                robot.status_inbox.clear()
+
+    def close(self):
+        if self.world is not None:
+            self.world.close()
+
+class VectorGoldEnv:
+    # n_envs GoldEnvs whose buffers are slices of shared (n_envs, 2N, ...)
+    # arrays, so one batched policy call (see batched.py) sees every env with
+    # no stacking. An env that finishes is reset straight away: its slice then
+    # holds the new episode's first observation, and the finished episode's
+    # info is kept under infos[i]["final"].
+    def __init__(self, n_envs, config=SimulationConfig(), message_width=0, max_turns=None, **world_kwargs):
+        n = config.n_robots
+        self.obs = observation_buffers((n_envs, 2 * n), n, message_width)
+        self.rewards = np.zeros((n_envs, 2 * n), dtype=np.float32)
+        self.terminated = np.zeros(n_envs, dtype=bool)
+        self.truncated = np.zeros(n_envs, dtype=bool)
+        self.envs = [GoldEnv(config, message_width, max_turns, {name: values[i] for name, values in self.obs.items()},
+                             self.rewards[i], **world_kwargs)
+                     for i in range(n_envs)]
+        self.infos = [env.info for env in self.envs]
+        self.next_seed = None
+
+    def reset(self, seed=None):
+        # Env i is seeded seed + i; envs reset later take the following seeds
+        for i, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + i)
+            env.info.pop("final", None)
+        self.next_seed = None if seed is None else seed + len(self.envs)
+        return self.obs, self.infos
+
+    def step(self, actions, messages=None, send=None):
+        for i, env in enumerate(self.envs):
+            _, _, terminated, truncated, info = env.step(actions[i], None if messages is None else messages[i],
+                                                         None if send is None else send[i])
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            info.pop("final", None)
+            if terminated or truncated:
+                final = dict(info)
+                env.reset(self.next_seed)
+                if self.next_seed is not None:
+                    self.next_seed += 1
+                info["final"] = final
+        return self.obs, self.rewards, self.terminated, self.truncated, self.infos
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a batched policy against real Worlds through the env API")
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--policy", choices=POLICIES, default="greedy")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    envs = VectorGoldEnv(args.envs)
+    obs, _ = envs.reset(args.seed)
+    policy = POLICIES[args.policy]
+    rng = np.random.default_rng(args.seed)
+    episodes = []
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        obs, _, terminated, truncated, infos = envs.step(policy(obs, rng))
+        episodes += [info["final"] for info in infos if "final" in info]
+    seconds = time.perf_counter() - start
+    print(f"{args.envs} envs x {args.steps} steps in {seconds:.2f}s ({args.envs * args.steps / seconds:,.0f} env steps/s)")
+    scores = [(info["red_score"], info["blue_score"]) for info in episodes or envs.infos]
+    print(f"Mean score RED {np.mean([r for r, _ in scores]):.2f} | BLUE {np.mean([b for _, b in scores]):.2f} "
+          f"over {len(scores)} {'finished' if episodes else 'running'} episode(s)")
+    envs.close()
+
+if __name__ == "__main__":
+    main()
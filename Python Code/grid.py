@@ -10,6 +10,14 @@ class Grid:
             for x in range(width):
                 row.append(Cell((x, y), p_gold, max_gold))
             self.grid.append(row)
+        # Coords whose rendering may have changed since the renderer last drew.
+        # None until a renderer attaches, so headless runs track nothing.
+        self.dirty_coords = None
+        # Every change to a cell's gold or robots (or a robot turning in it)
+        # stamps the cell with the next clock value, so a robot can tell whether
+        # anything in its view changed since it last looked
+        self.clock = 0
+        self.versions = {}
 
     def get_cell(self, coord):
         x, y = coord
@@ -21,26 +29,87 @@ class Grid:
         cell = self.get_cell(coord)
         if cell:
             cell.add_bot(robot)
+            if self.dirty_coords is not None:
+                self.dirty_coords.add(coord)
+            self.touch(coord)
 
     def remove_robot(self, robot, coord):
         cell = self.get_cell(coord)
         if cell:
             cell.remove_bot(robot)
+            if self.dirty_coords is not None:
+                self.dirty_coords.add(coord)
+            self.touch(coord)
 
-    def __str__(self):
-        import re
+    def mark_dirty(self, coord):
+        if self.dirty_coords is not None:
+            self.dirty_coords.add(coord)
+        self.touch(coord)
+
+    def touch(self, coord):
+        self.clock += 1
+        self.versions[coord] = self.clock
+
+    def get_version(self, coord):
+        return self.versions.get(coord, 0)
+
+    def changed_since(self, coords, stamp):
+        # Whether any of coords changed after the clock read stamp
+        if self.clock <= stamp:
+            return False
+        versions = self.versions
+        for coord in coords:
+            if versions.get(coord, 0) > stamp:
+                return True
+        return False
+
+    def get_gold_amount(self, coord):
+        cell = self.get_cell(coord)
+        if cell:
+            return cell.get_gold_amount()
+        return None
 
-        def get_visible_width(s):
-            return len(re.sub(r'\x1b\[[0-?]*[ -/]*[@-~]', '', s))
+    def gold_cells(self):
+        # [(coord, amount)] for every cell with gold, ordered by y then x
+        found = []
+        for y in range(self.height):
+            for x, cell in enumerate(self.grid[self.height - y - 1]):
+                amount = cell.get_gold_amount()
+                if amount:
+                    found.append(((x, y), amount))
+        return found
 
+    def get_total_gold(self):
+        return sum(cell.get_gold_amount() or 0 for row in self.grid for cell in row)
+
+    def get_occupancy(self, team=None):
+        occupancy = []
+        for y in range(self.height):
+            row = []
+            for x in range(self.width):
+                cell = self.get_cell((x, y))
+                count = 0
+                if team != "BLUE":
+                    count += len(cell.red_robots)
+                if team != "RED":
+                    count += len(cell.blue_robots)
+                row.append(count)
+            occupancy.append(row)
+        return occupancy
+
+    def get_gold_map(self):
+        return [[self.get_gold_amount((x, y)) or 0 for x in range(self.width)] for y in range(self.height)]
+
+    def _rows(self):
+        return self.grid
+
+    def __str__(self):
         CELL_WIDTH = 8
-        grid_str = ""
-        for row in self.grid:
+        lines = []
+        for row in self._rows():
+            line = []
             for cell in row:
-                cell_content = str(cell)
-                visible_width = get_visible_width(cell_content)
-                padding = " " * (CELL_WIDTH - visible_width)
-                grid_str += cell_content + padding
-            grid_str += "\n"
-        return grid_str
-
+                cell_content, visible_width = cell.render()
+                line.append(cell_content + " " * (CELL_WIDTH - visible_width))
+            lines.append("".join(line))
+        return "\n".join(lines) + "\n"
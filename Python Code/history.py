@@ -0,0 +1,66 @@
+import ast
+from collections import deque
+
+HISTORY_WINDOW = 50
+
+class HistoryArchive:
+    # Append-only text file for history entries that fall out of a robot's
+    # window. One line per entry: team, robot id, history name, entry index,
+    # entry. Ids are dense per team, so the team is part of the key.
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def write(self, team, robot_id, name, index, entry):
+        if self.file is None:
+            self.file = open(self.path, "a", buffering=1 << 16)
+        self.file.write(f"{team}\t{robot_id}\t{name}\t{index}\t{entry!r}\n")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __getstate__(self):
+        # Copies (snapshots, forks) reopen the file in append mode on first write
+        if self.file is not None:
+            self.file.flush()
+        return {"path": self.path, "file": None}
+
+class History:
+    # Keeps the last `window` entries. Older ones are dropped, or spilled to
+    # the archive when there is one, so memory stays constant over long runs.
+    def __init__(self, team, robot_id, name, window=HISTORY_WINDOW, archive=None):
+        self.team = team
+        self.robot_id = robot_id
+        self.name = name
+        self.entries = deque(maxlen=window)
+        self.archive = archive
+        self.total = 0
+
+    def append(self, entry):
+        if len(self.entries) == self.entries.maxlen and self.archive is not None:
+            self.archive.write(self.team, self.robot_id, self.name, self.total - len(self.entries), self.entries[0])
+        self.entries.append(entry)
+        self.total += 1
+
+    def recent(self, n):
+        return list(self.entries)[-n:]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, i):
+        return self.entries[i]
+
+def read_archive(path):
+    # {(team, robot id, history name): [(entry index, entry), ...]} in file order
+    histories = {}
+    with open(path) as f:
+        for line in f:
+            team, robot_id, name, index, entry = line.rstrip("\n").split("\t", 4)
+            histories.setdefault((team, int(robot_id), name), []).append((int(index), ast.literal_eval(entry)))
+    return histories
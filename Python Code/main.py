@@ -1,33 +1,75 @@
 from world import World
+from batch_runner import run_batch
+from renderer import TerminalRenderer
+from consensus import CONSENSUS_MODES
+from allocation import ALLOCATION_MODES
+from config import SimulationConfig
+import argparse
 import time
 
-WIDTH = 20
-HEIGHT = 20
-P_GOLD = 0.1
-MAX_GOLD = 3
-N_ROBOTS = 10
-TURNS = 2500
+CONFIG = SimulationConfig()
 
-def main():
-    world = World(WIDTH, HEIGHT, P_GOLD, MAX_GOLD, N_ROBOTS)
-    print("Initial Grid")
-    world.print_grid()
-    print("-" * 150)
+def main(config=CONFIG, delay=0.8, max_fps=None, trace=None, profile=None, metrics=None):
+    world = World.from_config(config, verbose=False)
+    if trace:
+        world.start_trace(trace)
+    if profile:
+        world.start_profiling(profile)
+    if metrics:
+        world.start_metrics(metrics, config.turns, {"config": config.to_dict()})
+    renderer = TerminalRenderer(world, max_fps=max_fps)
+    renderer.draw("Initial Grid")
 
-    for i in range(TURNS):
-        print(f"TURN {i}")
-        print("Current Grid")
-        world.print_grid()
-        # print("\nCurrent Robot Status")
-        # world.print_robots()
-        print()
+    for i in range(config.turns):
         world.next_turn()
-        print("-" * 150)
-        time.sleep(0.8)
+        renderer.draw(f"TURN {i} | RED: {world.red_score} | BLUE: {world.blue_score}", force=(i == config.turns - 1))
+        if delay:
+            time.sleep(delay)
 
-    print("Final Grid")
-    world.print_grid()
+    world.stop_trace()
+    world.stop_metrics()
+    profiler = world.stop_profiling()
+    print()
     print(f"Final Scores -> RED: {world.red_score} | BLUE: {world.blue_score}")
+    if profiler is not None:
+        summary = profiler.summary()
+        print(f"Turn time: {summary['turn_ms']:.3f} ms")
+        for phase, share in summary["phase_share"].items():
+            print(f"  {phase:<18} {100 * share:5.1f}%")
+
+def headless(config, args):
+    result = run_batch(args.episodes, config, base_seed=args.seed, workers=args.workers, trace_dir=args.trace,
+                       metrics_dir=args.metrics)
+    print(result.table())
+    if args.json:
+        result.to_json(args.json)
+    if args.csv:
+        result.to_csv(args.csv)
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", action="store_true", help="run seeded episodes without rendering")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=CONFIG.turns)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--json", help="write per-episode results to this JSON file")
+    parser.add_argument("--csv", help="write per-episode results to this CSV file")
+    parser.add_argument("--trace", help="record a binary trace (a directory of per-episode traces with --headless)")
+    parser.add_argument("--metrics", help="record per-turn metrics (a directory of per-episode files with --headless)")
+    parser.add_argument("--consensus", choices=CONSENSUS_MODES, default="paxos",
+                        help="pair assignment protocol (multi_paxos uses a leader with a lease)")
+    parser.add_argument("--allocation", choices=ALLOCATION_MODES, default=None,
+                        help="engine that picks gold pairs (default: proposer + nearest idle teammate)")
+    parser.add_argument("--profile", help="profile the live run, writing per-phase timings to this .json or .csv file")
+    parser.add_argument("--delay", type=float, default=0.8, help="seconds to wait between turns in the live view")
+    parser.add_argument("--fps", type=float, default=None, help="cap on live view redraws per second")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    config = CONFIG.replace(turns=args.turns, consensus=args.consensus, allocation=args.allocation)
+    if args.headless:
+        headless(config, args)
+    else:
+        main(config, args.delay, args.fps, args.trace, args.profile, args.metrics)
@@ -0,0 +1,73 @@
+import heapq
+
+class MessageScheduler:
+    # Delayed messages grouped into one bucket per delivery turn. Delivering a
+    # turn only touches the buckets that are due, not the whole backlog.
+    def __init__(self):
+        self.buckets = {}
+        self.broadcast_buckets = {}
+        self.bucket_turns = []  # min-heap of delivery turns that have a bucket
+        self.backlog = 0
+        self.peak_backlog = 0
+        self.scheduled_count = 0
+        self.delivered_count = 0
+        self.broadcast_count = 0
+        self.recipient_backlog = {}
+
+    def _get_bucket(self, buckets, other_buckets, delivery_turn):
+        bucket = buckets.get(delivery_turn)
+        if bucket is None:
+            bucket = buckets[delivery_turn] = []
+            if delivery_turn not in other_buckets:
+                heapq.heappush(self.bucket_turns, delivery_turn)
+        return bucket
+
+    def _count_scheduled(self, n):
+        self.scheduled_count += n
+        self.backlog += n
+        if self.backlog > self.peak_backlog:
+            self.peak_backlog = self.backlog
+
+    def schedule(self, recipient_id, message, delivery_turn):
+        self._get_bucket(self.buckets, self.broadcast_buckets, delivery_turn).append((recipient_id, message))
+        self.recipient_backlog[recipient_id] = self.recipient_backlog.get(recipient_id, 0) + 1
+        self._count_scheduled(1)
+
+    def schedule_broadcast(self, recipient_ids, payload, delivery_turn):
+        # A single entry carries the shared payload to every recipient whose
+        # own delay landed on this delivery turn
+        self._get_bucket(self.broadcast_buckets, self.buckets, delivery_turn).append((recipient_ids, payload))
+        for recipient_id in recipient_ids:
+            self.recipient_backlog[recipient_id] = self.recipient_backlog.get(recipient_id, 0) + 1
+        self._count_scheduled(len(recipient_ids))
+        self.broadcast_count += 1
+
+    def pop_due(self, turn):
+        # Returns (direct, broadcasts): [(recipient_id, message)] and
+        # [(recipient_ids, payload)] for everything due by this turn
+        direct = []
+        broadcasts = []
+        while self.bucket_turns and self.bucket_turns[0] <= turn:
+            delivery_turn = heapq.heappop(self.bucket_turns)
+            direct.extend(self.buckets.pop(delivery_turn, ()))
+            broadcasts.extend(self.broadcast_buckets.pop(delivery_turn, ()))
+        delivered = len(direct)
+        for recipient_id, _ in direct:
+            self.recipient_backlog[recipient_id] -= 1
+        for recipient_ids, _ in broadcasts:
+            for recipient_id in recipient_ids:
+                self.recipient_backlog[recipient_id] -= 1
+            delivered += len(recipient_ids)
+        self.delivered_count += delivered
+        self.backlog -= delivered
+        return direct, broadcasts
+
+    def get_stats(self):
+        return {
+            "backlog": self.backlog,
+            "peak_backlog": self.peak_backlog,
+            "scheduled": self.scheduled_count,
+            "delivered": self.delivered_count,
+            "broadcasts": self.broadcast_count,
+            "pending_turns": len(self.bucket_turns),
+        }
@@ -0,0 +1,84 @@
+PREPARE = 0
+PROMISE = 1
+ACCEPT = 2
+STATUS = 3
+HEARTBEAT = 4  # Multi-Paxos leader lease renewal
+REQUEST = 5    # Multi-Paxos gold sighting sent to the leader
+SIGNAL = 6     # payload broadcast by an outside policy through World.step_actions
+KIND_NAMES = ("PREPARE", "PROMISE", "ACCEPT", "STATUS", "HEARTBEAT", "REQUEST", "SIGNAL")
+
+# Fields carried by STATUS updates, in bit order of StatusUpdate.mask
+STATUS_FIELDS = ("coord", "is_carrying", "role", "goal")
+FULL_STATUS_MASK = (1 << len(STATUS_FIELDS)) - 1
+
+class Message:
+    # Point-to-point Paxos message. sender_id is the proposer for PREPARE and
+    # ACCEPT and the acceptor for PROMISE; value is only set on ACCEPT (and on
+    # REQUEST in Multi-Paxos mode). In Multi-Paxos, (proposal_number,
+    # sender_id) is the leader ballot.
+    __slots__ = ("kind", "proposal_number", "sender_id", "value")
+
+    def __init__(self, kind, proposal_number, sender_id, value=None):
+        self.kind = kind
+        self.proposal_number = proposal_number
+        self.sender_id = sender_id
+        self.value = value
+
+    def __repr__(self):
+        return f"{KIND_NAMES[self.kind]}({self.proposal_number}, {self.sender_id!r}, {self.value!r})"
+
+class StatusUpdate:
+    # Broadcast payload carrying only the status fields whose bit is set in
+    # mask. seq increases with every update a robot sends, so receivers can
+    # ignore fields older than what they already hold.
+    __slots__ = ("sender_id", "seq", "mask", "values")
+    kind = STATUS
+
+    def __init__(self, sender_id, seq, mask, values):
+        self.sender_id = sender_id
+        self.seq = seq
+        self.mask = mask
+        self.values = values
+
+    def is_full(self):
+        return self.mask == FULL_STATUS_MASK
+
+    def __repr__(self):
+        return f"STATUS({self.sender_id!r}, seq={self.seq}, mask={self.mask:#x}, {self.values!r})"
+
+class Signal:
+    # Broadcast payload chosen by a policy driving the world from outside
+    # (see env.py): a tuple of ints, delivered to each teammate's status_inbox
+    # with the usual random delays
+    __slots__ = ("sender_id", "values")
+    kind = SIGNAL
+
+    def __init__(self, sender_id, values):
+        self.sender_id = sender_id
+        self.values = values
+
+    def __repr__(self):
+        return f"SIGNAL({self.sender_id!r}, {self.values!r})"
+
+class TeammateStatus:
+    # Receiver-side view of one teammate, updated in place from StatusUpdates
+    __slots__ = ("id", "coord", "is_carrying", "role", "goal", "field_seqs")
+
+    def __init__(self, id):
+        self.id = id
+        self.coord = None
+        self.is_carrying = False
+        self.role = None
+        self.goal = None
+        self.field_seqs = [-1] * len(STATUS_FIELDS)
+
+    def apply(self, update):
+        values = iter(update.values)
+        for i, field in enumerate(STATUS_FIELDS):
+            if update.mask & (1 << i):
+                value = next(values)
+                # Delays are random per message, so an older update can arrive
+                # after a newer one; only take fields it is newer for
+                if update.seq > self.field_seqs[i]:
+                    setattr(self, field, value)
+                    self.field_seqs[i] = update.seq
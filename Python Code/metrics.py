@@ -0,0 +1,164 @@
+import json
+import os
+import struct
+import numpy as np
+
+# File layout (little-endian):
+#   PREFIX: magic, version, header length
+#   header: UTF-8 JSON {"rows", "columns": [{"name", "dtype", "offset"}], "attrs"}
+#   one contiguous array per column at its offset, aligned to ALIGNMENT bytes
+# Columns can be memory-mapped straight from the file, so reading one series
+# out of thousands of runs never loads the rest.
+
+MAGIC = b"GMET"
+VERSION = 1
+PREFIX = struct.Struct("<4sIQ")  # magic, version, header length
+ALIGNMENT = 64
+
+TEAMS = ("RED", "BLUE")
+COLUMNS = (
+    ("turn", np.int32),
+    ("red_score", np.int32),
+    ("blue_score", np.int32),
+    ("gold_remaining", np.int32),
+    ("red_backlog", np.int32),
+    ("blue_backlog", np.int32),
+    ("red_paxos_rounds", np.int16),   # robots leading a round: PROPOSER, CANDIDATE or REQUESTER
+    ("blue_paxos_rounds", np.int16),
+    ("red_idle", np.int16),           # robots per role (None, HELPER, CARRIER)
+    ("red_helpers", np.int16),
+    ("red_carriers", np.int16),
+    ("blue_idle", np.int16),
+    ("blue_helpers", np.int16),
+    ("blue_carriers", np.int16),
+)
+ROUND_ROLES = ("PROPOSER", "CANDIDATE", "REQUESTER")
+
+class MetricsRecorder:
+    # Per-turn time series for one World, kept in preallocated NumPy columns
+    # that double in size when a run outgrows them. The world calls record()
+    # at the end of every turn and gold_changed() whenever gold is taken off
+    # or put back on the ground, so remaining gold never needs a grid scan.
+    def __init__(self, world, path=None, capacity=2500, attrs=None):
+        self.path = path
+        self.attrs = attrs or {}
+        self.rows = 0
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS}
+        self.gold_remaining = world.grid.get_total_gold()
+
+    def gold_changed(self, delta):
+        self.gold_remaining += delta
+
+    def _grow(self):
+        for name, values in self.columns.items():
+            grown = np.zeros(2 * len(values), dtype=values.dtype)
+            grown[:self.rows] = values[:self.rows]
+            self.columns[name] = grown
+
+    def record(self, world):
+        if self.rows == len(self.columns["turn"]):
+            self._grow()
+        row = self.rows
+        columns = self.columns
+        columns["turn"][row] = world.turn_count
+        columns["red_score"][row] = world.red_score
+        columns["blue_score"][row] = world.blue_score
+        columns["gold_remaining"][row] = self.gold_remaining
+        for team, robot_manager, message_queue in (("red", world.red_team, world.red_message_queue),
+                                                   ("blue", world.blue_team, world.blue_message_queue)):
+            columns[f"{team}_backlog"][row] = message_queue.backlog
+            columns[f"{team}_paxos_rounds"][row] = sum(robot.paxos_role in ROUND_ROLES
+                                                       for robot in robot_manager.get_robots())
+            idle, helpers, carriers = np.bincount(robot_manager.get_state_table().role, minlength=3)
+            columns[f"{team}_idle"][row] = idle
+            columns[f"{team}_helpers"][row] = helpers
+            columns[f"{team}_carriers"][row] = carriers
+        self.rows += 1
+
+    def series(self, name):
+        return self.columns[name][:self.rows]
+
+    def flush(self, path=None):
+        write_metrics(path or self.path, {name: self.series(name) for name, _ in COLUMNS}, self.attrs)
+
+def write_metrics(path, columns, attrs=None):
+    # columns: {name: 1-d array}, all the same length
+    rows = len(next(iter(columns.values()))) if columns else 0
+    entries = [{"name": name, "dtype": np.asarray(values).dtype.str, "offset": 0} for name, values in columns.items()]
+    # Offsets depend on the header size, which depends on the offsets' digits:
+    # lay out with placeholder offsets until the header stops growing
+    header = b""
+    while True:
+        offset = _align(PREFIX.size + len(header))
+        for entry, values in zip(entries, columns.values()):
+            entry["offset"] = offset
+            offset = _align(offset + np.asarray(values).nbytes)
+        new_header = json.dumps({"rows": rows, "columns": entries, "attrs": attrs or {}}).encode()
+        if len(new_header) == len(header):
+            break
+        header = new_header
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for entry, values in zip(entries, columns.values()):
+            f.write(b"\0" * (entry["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(values).tobytes())
+    os.replace(tmp_path, path)
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+class MetricsFile:
+    # Lazy reader: only the header is parsed on open; each column is a
+    # read-only memmap created the first time it is asked for
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, header_length = PREFIX.unpack(f.read(PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a metrics file")
+            if version != VERSION:
+                raise ValueError(f"{path} has metrics format version {version}, expected {VERSION}")
+            header = json.loads(f.read(header_length))
+        self.rows = header["rows"]
+        self.attrs = header["attrs"]
+        self.layout = {entry["name"]: entry for entry in header["columns"]}
+        self._columns = {}
+
+    @property
+    def names(self):
+        return list(self.layout)
+
+    def __getitem__(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            entry = self.layout[name]
+            if self.rows == 0:
+                column = np.zeros(0, dtype=entry["dtype"])
+            else:
+                column = np.memmap(self.path, dtype=entry["dtype"], mode="r", offset=entry["offset"],
+                                   shape=(self.rows,))
+            self._columns[name] = column
+        return column
+
+    def __len__(self):
+        return self.rows
+
+def open_runs(directory, pattern=".metrics"):
+    # MetricsFile for every metrics file in directory, sorted by name. Opening
+    # only reads headers, so this stays cheap for thousands of runs.
+    return [MetricsFile(os.path.join(directory, name)) for name in sorted(os.listdir(directory))
+            if name.endswith(pattern)]
+
+def stack_column(runs, name, length=None):
+    # (runs, turns) array of one column, padded with each run's last value
+    # when runs have different lengths
+    length = length or max((len(run) for run in runs), default=0)
+    out = np.zeros((len(runs), length), dtype=runs[0].layout[name]["dtype"] if runs else np.int32)
+    for i, run in enumerate(runs):
+        values = run[name][:length]
+        out[i, :len(values)] = values
+        if 0 < len(values) < length:
+            out[i, len(values):] = values[-1]
+    return out
@@ -0,0 +1,155 @@
+import threading
+from array import array
+from collections import OrderedDict
+import numpy as np
+from sparse_grid import CHUNK_SIZE
+
+FACINGS = ("UP", "DOWN", "LEFT", "RIGHT")
+FACING_BITS = {facing: 1 << i for i, facing in enumerate(FACINGS)}
+
+# Gold target fields kept per team before the least recently used one is dropped
+GOLD_FIELD_CACHE_SIZE = 16
+
+def step_towards(coord, facing, target):
+    # The policy the fields encode, for robots without a NavigationCache:
+    # move on if the current facing gets closer to the target, otherwise turn
+    # along the axis with the larger distance (vertical on ties)
+    dx = target[0] - coord[0]
+    dy = target[1] - coord[1]
+    if (facing == 'RIGHT' and dx > 0) or (facing == 'LEFT' and dx < 0) \
+            or (facing == 'UP' and dy > 0) or (facing == 'DOWN' and dy < 0):
+        return 'MOVE'
+    return ('TURN', preferred_facing(dx, dy))
+
+def preferred_facing(dx, dy):
+    if abs(dx) > abs(dy):
+        return 'RIGHT' if dx > 0 else 'LEFT'
+    return 'UP' if dy > 0 else 'DOWN'
+
+class FieldTile:
+    # One CHUNK_SIZE square of a field (smaller at the right and top edges),
+    # flat and row-major. array.array for the same reason as BeliefChunk:
+    # lookups are single cells.
+    __slots__ = ("width", "distance", "reducing", "preferred")
+
+    def __init__(self, width, distance, reducing, preferred):
+        self.width = width
+        self.distance = array("i", distance.astype(np.int32).tobytes())
+        self.reducing = array("b", reducing.astype(np.int8).tobytes())
+        self.preferred = array("b", preferred.astype(np.int8).tobytes())
+
+class NavigationField:
+    # Distance and next-step table towards one target. For every cell: the
+    # distance, a bitmask of the facings that reduce it, and the facing to
+    # turn to otherwise. The grid has no obstacles, so the BFS distance is the
+    # Manhattan distance and a tile is built with array operations. Tiles are
+    # built the first time a robot asks from inside them, so a field on a
+    # large map only costs the tiles routes to its target cross.
+    def __init__(self, width, height, target):
+        self.width = width
+        self.height = height
+        self.target = target
+        self.tiles = {}  # (x // CHUNK_SIZE, y // CHUNK_SIZE) -> FieldTile
+
+    def _build_tile(self, key):
+        left, bottom = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+        ys, xs = np.mgrid[bottom:min(bottom + CHUNK_SIZE, self.height), left:min(left + CHUNK_SIZE, self.width)]
+        dx = self.target[0] - xs
+        dy = self.target[1] - ys
+        reducing = ((dy > 0) * FACING_BITS['UP'] | (dy < 0) * FACING_BITS['DOWN']
+                    | (dx < 0) * FACING_BITS['LEFT'] | (dx > 0) * FACING_BITS['RIGHT'])
+        horizontal = np.abs(dx) > np.abs(dy)
+        preferred = np.where(horizontal, np.where(dx > 0, 3, 2), np.where(dy > 0, 0, 1))
+        return FieldTile(xs.shape[1], np.abs(dx) + np.abs(dy), reducing, preferred)
+
+    def _lookup(self, coord):
+        x, y = coord
+        key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.tiles[key] = self._build_tile(key)
+        return tile, (y % CHUNK_SIZE) * tile.width + x % CHUNK_SIZE
+
+    def distance(self, coord):
+        tile, i = self._lookup(coord)
+        return tile.distance[i]
+
+    def step(self, coord, facing):
+        tile, i = self._lookup(coord)
+        if tile.reducing[i] & FACING_BITS[facing]:
+            return 'MOVE'
+        return ('TURN', FACINGS[tile.preferred[i]])
+
+    def facing(self, coord):
+        tile, i = self._lookup(coord)
+        return FACINGS[tile.preferred[i]]
+
+class NavigationCache:
+    # One per team. Fields to the team's deposit boxes are kept for the whole
+    # run; fields to gold targets are built on first use and kept in a small
+    # LRU. Fields are keyed by their target, so moving a deposit box
+    # (set_deposits) or losing a gold (forget) only has to drop fields, never
+    # patch them. Both robots of a pair read the same field, so they take the
+    # same route. Robots deciding on worker threads share it, hence the lock.
+    def __init__(self, width, height, deposit_coords=(), gold_cache_size=GOLD_FIELD_CACHE_SIZE):
+        self.width = width
+        self.height = height
+        self.deposit_fields = {}
+        self.gold_fields = OrderedDict()
+        self.gold_cache_size = gold_cache_size
+        self.fields_built = 0
+        self.lock = threading.Lock()
+        self.set_deposits(deposit_coords)
+
+    def set_deposits(self, deposit_coords):
+        with self.lock:
+            old = self.deposit_fields
+            self.deposit_fields = {}
+            for coord in deposit_coords:
+                field = old.get(coord)
+                if field is None:
+                    field = self._new_field(coord)
+                self.deposit_fields[coord] = field
+
+    def forget(self, target):
+        # The gold at target is gone; robots heading there will pick new goals
+        with self.lock:
+            self.gold_fields.pop(target, None)
+
+    def _new_field(self, target):
+        self.fields_built += 1
+        return NavigationField(self.width, self.height, target)
+
+    def get_field(self, target):
+        field = self.deposit_fields.get(target)
+        if field is not None:
+            return field
+        with self.lock:
+            field = self.gold_fields.get(target)
+            if field is not None:
+                self.gold_fields.move_to_end(target)
+                return field
+            field = self.gold_fields[target] = self._new_field(target)
+            if len(self.gold_fields) > self.gold_cache_size:
+                self.gold_fields.popitem(last=False)
+            return field
+
+    def step(self, coord, facing, target):
+        return self.get_field(target).step(coord, facing)
+
+    def facing_towards(self, coord, target):
+        return self.get_field(target).facing(coord)
+
+    def distance(self, coord, target):
+        return self.get_field(target).distance(coord)
+
+    def __getstate__(self):
+        # Gold fields are rebuilt on demand, so copies leave them behind
+        state = self.__dict__.copy()
+        state["gold_fields"] = OrderedDict()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
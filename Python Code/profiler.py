@@ -0,0 +1,124 @@
+import csv
+import json
+import time
+from messages import KIND_NAMES
+
+PHASES = ("clear_boards", "deliver_messages", "process_messages", "decide_and_act",
+          "pickup", "fumble", "deposit", "queue_messages")
+
+class TurnProfiler:
+    # Opt-in timing and counters for World.next_turn. The world calls mark()
+    # at the end of each phase, so a phase's time is the gap since the
+    # previous mark. Totals accumulate for the whole run; every
+    # export_interval turns a window with the deltas since the last one is
+    # appended to `windows` and, when export_path is set, written out as JSON
+    # (whole summary) or CSV (one row per window) depending on its extension.
+    def __init__(self, export_path=None, export_interval=100):
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.turns = 0
+        self.turn_seconds = 0.0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.decisions = 0
+        self.decision_seconds = 0.0
+        self.slowest_decision = (0.0, None, None)  # seconds, team, robot id
+        self.robot_decision_seconds = {}  # (team, robot id) -> seconds
+        self.counters = {}
+        self.gauges = {}
+        self.windows = []
+        self.window_start = self._totals()
+        self.turn_start = None
+        self.last_mark = None
+
+    def start_turn(self):
+        self.turn_start = self.last_mark = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def record_decision(self, robot, seconds):
+        self.decisions += 1
+        self.decision_seconds += seconds
+        key = (robot.team, robot.id)
+        self.robot_decision_seconds[key] = self.robot_decision_seconds.get(key, 0.0) + seconds
+        if seconds > self.slowest_decision[0]:
+            self.slowest_decision = (seconds, robot.team, robot.id)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def count_messages(self, prefix, counts):
+        # counts: message kind -> number of messages
+        for kind, n in counts.items():
+            self.count(f"{prefix}_{KIND_NAMES[kind]}", n)
+
+    def end_turn(self, world):
+        self.turn_seconds += time.perf_counter() - self.turn_start
+        self.turns += 1
+        metrics = world.consensus_metrics.values()
+        self.gauges = {
+            "timeouts": sum(m.timeouts for m in metrics),
+            "failed_rounds": sum(m.failed_rounds for m in metrics),
+            "message_backlog": world.red_message_queue.backlog + world.blue_message_queue.backlog,
+        }
+        if self.turns % self.export_interval == 0:
+            self.close_window(world.turn_count)
+
+    def _totals(self):
+        totals = {"turn_seconds": self.turn_seconds, "decision_seconds": self.decision_seconds,
+                  "decisions": self.decisions}
+        totals.update((f"{phase}_seconds", seconds) for phase, seconds in self.phase_seconds.items())
+        totals.update(self.counters)
+        return totals
+
+    def close_window(self, turn):
+        totals = self._totals()
+        turns = self.turns - self.window_start.get("turns", 0)
+        window = {"turn": turn, "turns": turns}
+        for key, value in totals.items():
+            window[key] = value - self.window_start.get(key, 0)
+        window.update(self.gauges)
+        totals["turns"] = self.turns
+        self.window_start = totals
+        self.windows.append(window)
+        if self.export_path:
+            self.export(self.export_path)
+
+    def summary(self):
+        turns = self.turns or 1
+        slowest, team, robot_id = self.slowest_decision
+        hottest = sorted(self.robot_decision_seconds.items(), key=lambda item: -item[1])[:5]
+        return {
+            "turns": self.turns,
+            "turn_ms": 1000 * self.turn_seconds / turns,
+            "phases_ms": {phase: 1000 * seconds / turns for phase, seconds in self.phase_seconds.items()},
+            "phase_share": {phase: seconds / self.turn_seconds if self.turn_seconds else 0.0
+                            for phase, seconds in self.phase_seconds.items()},
+            "decisions": self.decisions,
+            "decision_mean_us": 1e6 * self.decision_seconds / self.decisions if self.decisions else 0.0,
+            "slowest_decision": {"ms": 1000 * slowest, "team": team, "robot": robot_id},
+            "hottest_robots_ms": [{"team": t, "robot": r, "ms": 1000 * s} for (t, r), s in hottest],
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    def export(self, path):
+        if path.endswith(".csv"):
+            self.to_csv(path)
+        else:
+            self.to_json(path)
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "windows": self.windows}, f, indent=2)
+
+    def to_csv(self, path):
+        fields = []
+        for window in self.windows:
+            fields.extend(key for key in window if key not in fields)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, restval=0)
+            writer.writeheader()
+            writer.writerows(self.windows)
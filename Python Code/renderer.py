@@ -0,0 +1,86 @@
+import sys
+import time
+
+CELL_WIDTH = 8
+CLEAR_SCREEN = "\033[2J\033[H"
+CLEAR_LINE = "\033[K"
+
+def move_cursor(row, col):
+    return f"\033[{row};{col}H"
+
+class TerminalRenderer:
+    # Draws the grid once, then only rewrites cells that changed since the last
+    # frame, using cursor positioning. Grids report robot moves through
+    # dirty_coords and the world marks gold/deposit changes; carrying state is
+    # picked up by re-rendering the cells carrying robots were on.
+    def __init__(self, world, max_fps=None, cell_width=CELL_WIDTH):
+        self.world = world
+        self.grid = world.grid
+        self.cell_width = cell_width
+        self.min_frame_interval = 1.0 / max_fps if max_fps else 0
+        self.last_frame_time = None
+        self.cache = {}  # coord -> (text, visible width) as currently on screen
+        self.carrying_coords = set()
+        self.status_row = self.grid.height + 1
+        # Grids only track changed cells once a renderer asks for them
+        if self.grid.dirty_coords is None:
+            self.grid.dirty_coords = set()
+
+    def _screen_position(self, coord):
+        x, y = coord
+        return self.grid.height - y, x * self.cell_width + 1
+
+    def _padded(self, text, width):
+        return text + " " * (self.cell_width - width)
+
+    def _get_carrying_coords(self):
+        robots = self.world.red_team.get_carrying_robots() + self.world.blue_team.get_carrying_robots()
+        return {robot.current_coord for robot in robots}
+
+    def render_full(self, status=""):
+        self.cache.clear()
+        out = [CLEAR_SCREEN]
+        for y in range(self.grid.height - 1, -1, -1):
+            line = []
+            for x in range(self.grid.width):
+                rendered = self.grid.get_cell((x, y)).render()
+                self.cache[(x, y)] = rendered
+                line.append(self._padded(*rendered))
+            out.append("".join(line) + "\n")
+        out.append(move_cursor(self.status_row, 1) + status + CLEAR_LINE)
+        self.grid.dirty_coords.clear()
+        self.carrying_coords = self._get_carrying_coords()
+        return "".join(out)
+
+    def render(self, status=""):
+        if not self.cache:
+            return self.render_full(status)
+
+        carrying_coords = self._get_carrying_coords()
+        dirty = self.grid.dirty_coords | self.carrying_coords | carrying_coords
+        self.grid.dirty_coords.clear()
+        self.carrying_coords = carrying_coords
+
+        out = []
+        for coord in dirty:
+            cell = self.grid.get_cell(coord)
+            if cell is None:
+                continue
+            rendered = cell.render()
+            if self.cache.get(coord) == rendered:
+                continue
+            self.cache[coord] = rendered
+            out.append(move_cursor(*self._screen_position(coord)) + self._padded(*rendered))
+        out.append(move_cursor(self.status_row, 1) + status + CLEAR_LINE)
+        return "".join(out)
+
+    def draw(self, status="", out=sys.stdout, force=False):
+        # Frames that come in faster than max_fps are skipped; their changes
+        # stay dirty and go out with the next frame that is drawn
+        now = time.perf_counter()
+        if not force and self.last_frame_time is not None and now - self.last_frame_time < self.min_frame_interval:
+            return False
+        self.last_frame_time = now
+        out.write(self.render(status))
+        out.flush()
+        return True
@@ -1,33 +1,75 @@
 import random
+import sys
+from visibility import get_visibility_index
+from history import History, HISTORY_WINDOW
+from navigation import step_towards, preferred_facing
+from belief import BeliefMap, NEVER
+from config import RobotTimeouts
+from messages import Message, StatusUpdate, TeammateStatus, PREPARE, PROMISE, ACCEPT, HEARTBEAT, REQUEST, FULL_STATUS_MASK
+from consensus import ConsensusMetrics, HEARTBEAT_INTERVAL, LEASE_TURNS, ASSIGNMENT_TTL
+
+# Turns between full STATUS broadcasts; deltas are sent in between
+STATUS_REFRESH_TURNS = 10
+# How many turns back a sighting can still start a proposal (None: any gold
+# the robot remembers). In classic Paxos every robot that remembers gold would
+# propose at once and the rounds starve each other, so only gold in view
+# counts; the Multi-Paxos leader serializes requests, so memory pays off there.
+PROPOSAL_MEMORY_TURNS = {"paxos": 0, "multi_paxos": None}
+# Proposer id no real robot can have, for "not promised to anyone yet"
+NO_PROMISE = sys.maxsize
+
+def display_name(team, id):
+    # Robot ids are dense per-team ints; names are only for printing. The
+    # first 26 keep their letters (RED A-Z, BLUE a-z), later ones add the id.
+    first = 'A' if team == "RED" else 'a'
+    return chr(ord(first) + id) if id < 26 else f"{first}{id}"
 
 class Robot:
-    def __init__(self, id, team, current_coord, facing, message_board, deposit_box_coord):
+    def __init__(self, id, team, current_coord, facing, message_board, deposit_box_coord,
+                 history_window=HISTORY_WINDOW, history_archive=None):
         self.id = id
         self.team = team
+        self.name = display_name(team, id)
+        # Plain attributes: decisions read these constantly. The team's
+        # RobotStateTable copies them in one pass when a batch reader asks.
         self.current_coord = current_coord
         self.facing = facing
         self.is_carrying = False
         self.pair_id = None
-        self.coord_history = [current_coord]
-        self.action_history = []
+        self.coord_history = History(team, id, "coord", history_window, history_archive)
+        self.coord_history.append(current_coord)
+        self.action_history = History(team, id, "action", history_window, history_archive)
+        self.previous_coord = current_coord # Where this turn started, for fumble placement
+        self.pickup_streak = 0
         self.turn_count = 0
-        self.observable_cells = []
-        self.knowledge_base = {}
+        self.observable_cells = ()
+        self.view_stamp = -1 # Grid clock when this robot last observed
+        self.beliefs = None # BeliefMap: the gold last seen in every cell, kept across turns
         self.visible_robots = {}
         self.teammate_knowledge_base = {}
         self.message_board = message_board
+        self.read_board = None
+        self.broadcast_board = []
+        self.status_inbox = []
+        self.last_status = None
+        self.last_full_status_turn = 0
+        self.status_seq = 0
         self.deposit_box_coord = deposit_box_coord
         self.goal = None
         self.role = None # HELPER, CARRIER
         self.expected_partner = None
         self.aligned_for_pickup = False
         self.wait_turn_counter = 0
+        self.navigation = None # Team's NavigationCache, set by the world
+        self.allocator = None # Engine from allocation.py; None pairs with the nearest teammate
+        self.timeouts = RobotTimeouts() # Timers in turns, set by the world from its config
+        self.rng = None # Private random.Random for two-phase turns; the global one otherwise
 
         # For Paxos
         self.paxos_role = 'IDLE'  # IDLE, PROPOSER, ACCEPTOR
         self.paxos_turn_timer = 0
         self.proposal_number = 0
-        self.promised_proposer_id = '~'
+        self.promised_proposer_id = NO_PROMISE
         self.last_promised_proposal = None
         self.accepted_proposal_number = None
         self.accepted_value = None
@@ -36,68 +78,69 @@ class Robot:
         self.proposals = {}
         self.promises = []
 
+        # "paxos" runs a full round per gold sighting; "multi_paxos" sends
+        # sightings to a leader. Both are set by the world, along with the
+        # metrics the team shares.
+        self.consensus = "paxos"
+        self.consensus_metrics = ConsensusMetrics()
+
+        # For Multi-Paxos. Robot 0 starts as leader, so no election is needed
+        # unless its lease runs out.
+        self.ballot = (0, 0)  # highest (number, leader id) promised
+        self.leader_id = 0
+        self.is_leader = id == 0
+        self.lease_expires = LEASE_TURNS
+        self.last_heartbeat_turn = None
+        self.pending_requests = []  # leader: (gold coord, requester id, sighting turn)
+        self.claimed_gold = {}      # leader: gold coord -> turn assigned
+        self.busy_robots = {}       # leader: robot id -> turn assigned
+
     def calculate_distance(self, coord1, coord2):
         return abs(coord1[0] - coord2[0]) + abs(coord1[1] - coord2[1])
 
     def get_move_towards(self, target_coord):
-        x, y = self.current_coord
-        target_x, target_y = target_coord
-
-        dx = target_x - x
-        dy = target_y - y
-
-        if abs(dx) > abs(dy):
-            if dx > 0:
-                if self.facing == 'RIGHT': return 'MOVE'
-                else: return ('TURN', 'RIGHT')
-            else:
-                if self.facing == 'LEFT': return 'MOVE'
-                else: return ('TURN', 'LEFT')
-        else:
-            if dy > 0:
-                if self.facing == 'UP': return 'MOVE'
-                else: return ('TURN', 'UP')
-            else:
-                if self.facing == 'DOWN': return 'MOVE'
-                else: return ('TURN', 'DOWN')
+        if self.navigation is not None:
+            return self.navigation.step(self.current_coord, self.facing, target_coord)
+        return step_towards(self.current_coord, self.facing, target_coord)
 
     def find_closest_teammate(self, robot_manager):
         closest_teammate_id = None
         min_dist = float('inf')
         for teammate_id, status in self.teammate_knowledge_base.items():
             # Only consider teammates without a role
-            if teammate_id != self.id and status.get('role') is None:
-                dist = self.calculate_distance(self.current_coord, status['coord'])
+            if teammate_id != self.id and status.role is None:
+                dist = self.calculate_distance(self.current_coord, status.coord)
                 if dist < min_dist:
                     min_dist = dist
                     closest_teammate_id = teammate_id
         return closest_teammate_id
 
     def make_decision(self, robot_manager):
-        # If stuck for more than 20 turns, reset
-        if len(self.action_history) >= 20:
-            recent_actions = self.action_history[-20:]
-            if recent_actions.count("PICK_UP") == 20:
-                # print(f"TIMEOUT: Robot {self.id} stuck doing PICK_UP for 20+ turns. Resetting.")
-                
-                if self.is_carrying:
-                    self.is_carrying = False
-                    self.pair_id = None
-                
-                self.role = None
-                self.goal = None
-                self.expected_partner = None
-                self.aligned_for_pickup = False
-                self.wait_turn_counter = 0
-                self.paxos_role = 'IDLE'
-                self.paxos_turn_timer = 0
-                self.promises = []
+        # If stuck doing PICK_UP for too long, reset
+        if self.pickup_streak >= self.timeouts.stuck_pickup:
+            # print(f"TIMEOUT: Robot {self.id} stuck doing PICK_UP for 20+ turns. Resetting.")
+            
+            if self.is_carrying:
+                self.is_carrying = False
+                self.pair_id = None
+            
+            self.role = None
+            self.goal = None
+            self.expected_partner = None
+            self.aligned_for_pickup = False
+            self.wait_turn_counter = 0
+            self.paxos_role = 'IDLE'
+            self.paxos_turn_timer = 0
+            self.promises = []
         
         # Timeout
         if self.paxos_role != 'IDLE':
             self.paxos_turn_timer += 1
-            if self.paxos_turn_timer > 10:
+            if self.paxos_turn_timer > self.timeouts.paxos:
                 # print(f"PAXOS: Robot {self.id} timed out. Resetting to IDLE.")
+                self.consensus_metrics.timeouts += 1
+                if self.paxos_role in ('PROPOSER', 'REQUESTER', 'CANDIDATE'):
+                    self.consensus_metrics.failed_rounds += 1
                 self.paxos_role = 'IDLE'
                 self.paxos_turn_timer = 0
                 self.promises = []
@@ -109,6 +152,8 @@ class Robot:
 
         # 1. Broadcast and process status
         self.broadcast_status(robot_manager)
+        if self.consensus == "multi_paxos":
+            self._run_multi_paxos(robot_manager)
 
         # 2. Role-based logic
         if self.role == 'CARRIER':
@@ -120,11 +165,10 @@ class Robot:
         if self.role == 'HELPER':
             if self.goal:
                 if self.current_coord == self.goal:
-                    current_cell = self.knowledge_base.get(self.current_coord)
-                    if current_cell and current_cell.get_gold_amount():
+                    if self.beliefs.gold_at(self.current_coord):
                         # Wait for partner before picking up
                         partner_id = self._get_partner_from_accepted_value()
-                        if partner_id:
+                        if partner_id is not None:
                             partner_present, partner_facing = self._is_partner_at_location(partner_id, self.current_coord)
                             
                             if partner_present:
@@ -146,7 +190,7 @@ class Robot:
                             else:
                                 # Wait for partner to arrive
                                 self.wait_turn_counter += 1
-                                if self.wait_turn_counter > 30:
+                                if self.wait_turn_counter > self.timeouts.partner_wait:
                                     # print(f"⚠️ WAIT TIMEOUT: Robot {self.id} waited too long for partner {partner_id}. Resetting.")
                                     self.role = None
                                     self.goal = None
@@ -186,7 +230,7 @@ class Robot:
                 accepted_value = self.proposals[self.proposal_number]
                 for teammate in robot_manager.get_robots():
                     if teammate.id != self.id:
-                        self.message_board[teammate.id].add(('ACCEPT', self.proposal_number, accepted_value))
+                        self.message_board[teammate.id].add(Message(ACCEPT, self.proposal_number, self.id, accepted_value))
                 
                 # Proposer accpets
                 self.accepted_proposal_number = self.proposal_number
@@ -194,6 +238,7 @@ class Robot:
                 # print(f"PAXOS: Robot {self.id} has accepted proposal {self.proposal_number}.")
                 if self.id in self.accepted_value[1]:
                     # print(f"PAXOS: Robot {self.id} is now a HELPER.")
+                    self.consensus_metrics.record_adoption(accepted_value, accepted_value[2], self.turn_count)
                     self.goal = self.accepted_value[0]
                     self.role = 'HELPER'
                     # Set expected partner
@@ -204,63 +249,88 @@ class Robot:
                 self.promises = []
 
         # 4. Discover and Propose
-        # If sees gold, start a new proposal
-        if self.paxos_role == 'IDLE' and not self.is_carrying and (self.turn_count - self.last_proposal_turn) > 5:
-            for coord, cell in self.knowledge_base.items():
-                if cell.get_gold_amount():
-                    helpers_on_this_goal = 0
-                    for teammate_status in self.teammate_knowledge_base.values():
-                        if teammate_status.get('role') == 'HELPER' and teammate_status.get('goal') == coord:
-                            helpers_on_this_goal += 1
-                    
-                    if helpers_on_this_goal >= 2:
-                        continue
-
-                    # Found gold, become a proposer
-                    # print(f"PAXOS: Robot {self.id} found gold at {coord} and became a PROPOSER.")
-                    self.paxos_role = 'PROPOSER'
-                    self.proposal_number += 1
-                    self.last_proposal_turn = self.turn_count
-                    closest_teammate_id = self.find_closest_teammate(robot_manager)
-                    if closest_teammate_id:
-                        value = (coord, (self.id, closest_teammate_id))
-                        self.proposals[self.proposal_number] = value
-                        # Send PREPARE message
-                        # print(f"PAXOS: Robot {self.id} is sending PREPARE for proposal {self.proposal_number}.")
-                        for teammate in robot_manager.get_robots():
-                            if teammate.id != self.id:
-                                self.message_board[teammate.id].add(('PREPARE', self.proposal_number, self.id))
+        # If it knows of gold, start a new proposal for the nearest
+        if self.paxos_role == 'IDLE' and not self.is_carrying \
+                and (self.turn_count - self.last_proposal_turn) > self.timeouts.proposal_cooldown:
+            memory = PROPOSAL_MEMORY_TURNS[self.consensus]
+            seen_since = NEVER if memory is None else self.turn_count - memory
+            for coord in self.beliefs.gold_by_distance(self.current_coord, seen_since):
+                helpers_on_this_goal = 0
+                for teammate_status in self.teammate_knowledge_base.values():
+                    if teammate_status.role == 'HELPER' and teammate_status.goal == coord:
+                        helpers_on_this_goal += 1
+                
+                if helpers_on_this_goal >= 2:
+                    continue
+
+                if self.consensus == "multi_paxos":
+                    if self._request_assignment(coord, robot_manager):
                         return None
+                    break
+
+                pair = self._choose_pair(coord, robot_manager)
+                if pair is None and self.allocator is not None:
+                    continue
+
+                # Found gold, become a proposer
+                # print(f"PAXOS: Robot {self.id} found gold at {coord} and became a PROPOSER.")
+                self.paxos_role = 'PROPOSER'
+                self.proposal_number += 1
+                self.last_proposal_turn = self.turn_count
+                if pair is not None:
+                    value = (coord, pair, self.turn_count)
+                    self.proposals[self.proposal_number] = value
+                    self.consensus_metrics.rounds += 1
+                    # Send PREPARE message
+                    # print(f"PAXOS: Robot {self.id} is sending PREPARE for proposal {self.proposal_number}.")
+                    for teammate in robot_manager.get_robots():
+                        if teammate.id != self.id:
+                            self.message_board[teammate.id].add(Message(PREPARE, self.proposal_number, self.id))
+                    return None
 
         # 5. Explore randomly
-        return random.choice(["MOVE", ("TURN", random.choice(["LEFT", "RIGHT", "UP", "DOWN"]))])
+        rng = self.rng or random
+        return rng.choice(["MOVE", ("TURN", rng.choice(["LEFT", "RIGHT", "UP", "DOWN"]))])
 
     def process_messages(self, robot_manager):
-        if not hasattr(self, 'read_board') or self.id not in self.read_board:
+        for update in self.status_inbox:
+            status = self.teammate_knowledge_base.get(update.sender_id)
+            if status is None:
+                # Deltas from a teammate we have no full status for yet are
+                # dropped; its next full refresh fills the entry in
+                if not update.is_full():
+                    continue
+                status = self.teammate_knowledge_base[update.sender_id] = TeammateStatus(update.sender_id)
+            status.apply(update)
+        self.status_inbox.clear()
+
+        if self.read_board is None or self.id >= len(self.read_board):
             return
         
         my_messages = list(self.read_board[self.id])
         self.read_board[self.id].clear()
+        if self.consensus == "multi_paxos":
+            self._process_multi_paxos_messages(my_messages)
+            return
 
-        prepare_messages = [msg for msg in my_messages if msg[0] == 'PREPARE']
-        accept_messages = [msg for msg in my_messages if msg[0] == 'ACCEPT']
-        promise_messages = [msg for msg in my_messages if msg[0] == 'PROMISE']
-        status_messages = [msg for msg in my_messages if msg[0] == 'STATUS']
+        prepare_messages = [msg for msg in my_messages if msg.kind == PREPARE]
+        accept_messages = [msg for msg in my_messages if msg.kind == ACCEPT]
+        promise_messages = [msg for msg in my_messages if msg.kind == PROMISE]
 
         best_incoming_prepare = None
         for msg in prepare_messages:
-            if msg[2] == self.id: continue
+            if msg.sender_id == self.id: continue
             
             if best_incoming_prepare is None:
                 best_incoming_prepare = msg
             else:
-                if msg[1] > best_incoming_prepare[1]:
+                if msg.proposal_number > best_incoming_prepare.proposal_number:
                     best_incoming_prepare = msg
-                elif msg[1] == best_incoming_prepare[1] and msg[2] < best_incoming_prepare[2]:
+                elif msg.proposal_number == best_incoming_prepare.proposal_number and msg.sender_id < best_incoming_prepare.sender_id:
                     best_incoming_prepare = msg
         
         if best_incoming_prepare:
-            proposal_num, proposer_id = best_incoming_prepare[1], best_incoming_prepare[2]
+            proposal_num, proposer_id = best_incoming_prepare.proposal_number, best_incoming_prepare.sender_id
             # print(f"PAXOS: Robot {self.id} received PREPARE from {proposer_id} for proposal {proposal_num}.")
 
             if self.paxos_role == 'PROPOSER' and proposal_num <= self.proposal_number:
@@ -272,10 +342,10 @@ class Robot:
                 self.proposal_number = proposal_num
                 self.promised_proposer_id = proposer_id
                 self.paxos_role = 'ACCEPTOR'
-                self.message_board[proposer_id].add(('PROMISE', proposal_num, self.id))
+                self.message_board[proposer_id].add(Message(PROMISE, proposal_num, self.id))
 
         for msg in accept_messages:
-            _, proposal_num, value = msg
+            proposal_num, value = msg.proposal_number, msg.value
             # print(f"PAXOS: Robot {self.id} received ACCEPT for proposal {proposal_num} with value {value}.")
             if self.paxos_role == 'ACCEPTOR' and proposal_num == self.proposal_number:
                 self.accepted_proposal_number = proposal_num
@@ -285,37 +355,226 @@ class Robot:
 
                 if self.id in self.accepted_value[1]:
                     # print(f"PAXOS: Robot {self.id} is now a HELPER.")
+                    self.consensus_metrics.record_adoption(value, value[2], self.turn_count)
                     self.goal = self.accepted_value[0]
                     self.role = 'HELPER'
                     robot_ids = self.accepted_value[1]
                     self.expected_partner = robot_ids[0] if robot_ids[1] == self.id else robot_ids[1]
 
         for msg in promise_messages:
-            _, proposal_num, from_id = msg
+            proposal_num, from_id = msg.proposal_number, msg.sender_id
             # print(f"PAXOS: Robot {self.id} received PROMISE from {from_id} for proposal {proposal_num}.")
             if self.paxos_role == 'PROPOSER' and proposal_num == self.proposal_number:
                 self.promises.append(from_id)
-        
-        for msg in status_messages:
-            _, status_info_tuple = msg
-            status_info = dict(status_info_tuple)
-            self.teammate_knowledge_base[status_info['id']] = status_info
     
-    def broadcast_status(self, robot_manager):
-        status_info = {
-            'id': self.id,
-            'coord': self.current_coord,
-            'is_carrying': self.is_carrying,
-            'role': self.role,
-            'goal': self.goal,
-        }
+    # Multi-Paxos: the leader holds a lease that its heartbeats and ACCEPTs
+    # renew. While the lease holds it skips phase 1 and assigns gold with one
+    # ACCEPT per turn carrying every assignment it has. Phase 1 only runs to
+    # elect a new leader once the lease has run out.
+    def _run_multi_paxos(self, robot_manager):
+        if self.is_leader:
+            if self.last_heartbeat_turn is None or self.turn_count - self.last_heartbeat_turn >= HEARTBEAT_INTERVAL:
+                self._send_to_team(robot_manager, Message(HEARTBEAT, self.ballot[0], self.id))
+                self.last_heartbeat_turn = self.turn_count
+            self._assign_pending(robot_manager)
+        elif self.paxos_role == 'CANDIDATE':
+            if len(self.promises) > len(robot_manager.get_robots()) / 2:
+                # print(f"PAXOS: Robot {self.id} is now the leader with ballot {self.ballot}.")
+                self.is_leader = True
+                self.leader_id = self.id
+                self.paxos_role = 'IDLE'
+                self.promises = []
+                self.pending_requests = []
+                self.last_heartbeat_turn = self.turn_count
+                self._send_to_team(robot_manager, Message(HEARTBEAT, self.ballot[0], self.id))
+        elif self.paxos_role == 'IDLE' and self.turn_count > self.lease_expires + self.id % HEARTBEAT_INTERVAL:
+            # Lease ran out; ids stagger the timeouts so one candidate usually goes first
+            self.paxos_role = 'CANDIDATE'
+            self.ballot = (self.ballot[0] + 1, self.id)
+            self.leader_id = None
+            self.promises = [self.id]
+            self.consensus_metrics.elections += 1
+            self.consensus_metrics.rounds += 1
+            self._send_to_team(robot_manager, Message(PREPARE, self.ballot[0], self.id))
+
+    def _send_to_team(self, robot_manager, message):
         for teammate in robot_manager.get_robots():
             if teammate.id != self.id:
-                self.message_board[teammate.id].add(('STATUS', tuple(status_info.items())))
+                self.message_board[teammate.id].add(message)
+
+    def _request_assignment(self, coord, robot_manager):
+        if self.is_leader:
+            self.pending_requests.append((coord, self.id, self.turn_count))
+        elif self.leader_id is not None:
+            self.message_board[self.leader_id].add(Message(REQUEST, self.ballot[0], self.id, (coord, self.turn_count)))
+        else:
+            return False
+        self.paxos_role = 'REQUESTER'
+        self.last_proposal_turn = self.turn_count
+        self.consensus_metrics.requests += 1
+        if self.is_leader:
+            self._assign_pending(robot_manager)
+        return True
+
+    def _assign_pending(self, robot_manager):
+        if not self.pending_requests:
+            return
+        now = self.turn_count
+        for taken in (self.claimed_gold, self.busy_robots):
+            for key in [key for key, turn in taken.items() if now - turn > ASSIGNMENT_TTL]:
+                del taken[key]
+        busy = set(self.busy_robots)
+        busy.update(teammate_id for teammate_id, status in self.teammate_knowledge_base.items()
+                    if status.role is not None or status.is_carrying)
+        if self.role is not None or self.is_carrying:
+            busy.add(self.id)
+
+        assignments = []
+        if self.allocator is not None:
+            sightings = {}
+            for coord, requester_id, sighting_turn in self.pending_requests:
+                if coord not in self.claimed_gold:
+                    sightings.setdefault(coord, sighting_turn)
+            allocation = self.allocator.allocate(self._idle_robots(busy), list(sightings))
+            assignments = [(coord, pair, sightings[coord]) for coord, pair in allocation.items()]
+        else:
+            for coord, requester_id, sighting_turn in self.pending_requests:
+                if coord in self.claimed_gold or requester_id in busy:
+                    continue
+                partner_id = self._closest_idle_teammate(coord, busy, requester_id)
+                if partner_id is None:
+                    continue
+                assignments.append((coord, (requester_id, partner_id), sighting_turn))
+                self.claimed_gold[coord] = now
+                busy.update((requester_id, partner_id))
+        for coord, pair, _ in assignments:
+            self.claimed_gold[coord] = now
+            for robot_id in pair:
+                self.busy_robots[robot_id] = now
+        self.pending_requests = []
+        if not assignments:
+            return
+
+        # print(f"PAXOS: Leader {self.id} is sending {len(assignments)} assignments.")
+        self.consensus_metrics.rounds += 1
+        self.last_heartbeat_turn = now
+        self._send_to_team(robot_manager, Message(ACCEPT, self.ballot[0], self.id, tuple(assignments)))
+        for assignment in assignments:
+            if self.id in assignment[1]:
+                self._adopt_assignment(assignment)
+
+    def _choose_pair(self, coord, robot_manager):
+        # Without an allocator the proposer pairs itself with its nearest idle
+        # teammate. With one, the pair comes from an allocation over coord and
+        # the other gold in view that is still short of helpers, and can leave
+        # the proposer out. Remembered gold elsewhere is not part of the
+        # problem, so each solve stays the size of one view.
+        if self.allocator is None:
+            closest_teammate_id = self.find_closest_teammate(robot_manager)
+            return None if closest_teammate_id is None else (self.id, closest_teammate_id)
+        helpers = {}
+        for teammate_status in self.teammate_knowledge_base.values():
+            if teammate_status.role == 'HELPER':
+                helpers[teammate_status.goal] = helpers.get(teammate_status.goal, 0) + 1
+        golds = [coord]
+        golds += [gold_coord for gold_coord in self.observable_cells
+                  if gold_coord != coord and self.beliefs.gold_at(gold_coord) and helpers.get(gold_coord, 0) < 2]
+        return self.allocator.allocate(self._idle_robots(set()), golds).get(coord)
+
+    def _idle_robots(self, busy):
+        # Robots this one believes are free to take gold, as {id: coord}
+        robots = {teammate_id: status.coord for teammate_id, status in self.teammate_knowledge_base.items()
+                  if status.role is None and not status.is_carrying and status.coord is not None
+                  and teammate_id not in busy}
+        if self.id not in busy and self.role is None and not self.is_carrying:
+            robots[self.id] = self.current_coord
+        return robots
+
+    def _closest_idle_teammate(self, coord, busy, requester_id):
+        closest_id = None
+        min_dist = float('inf')
+        for teammate_id, teammate_coord in self._idle_robots(busy).items():
+            if teammate_id == requester_id:
+                continue
+            dist = self.calculate_distance(coord, teammate_coord)
+            if dist < min_dist:
+                min_dist = dist
+                closest_id = teammate_id
+        return closest_id
+
+    def _adopt_assignment(self, assignment):
+        coord, pair, sighting_turn = assignment
+        if self.role is not None or self.is_carrying:
+            return
+        # print(f"PAXOS: Robot {self.id} is now a HELPER for {coord}.")
+        self.consensus_metrics.record_adoption(assignment, sighting_turn, self.turn_count)
+        self.accepted_value = (coord, pair)
+        self.goal = coord
+        self.role = 'HELPER'
+        self.expected_partner = pair[0] if pair[1] == self.id else pair[1]
+        self.paxos_role = 'IDLE'
+        self.promises = []
+
+    def _process_multi_paxos_messages(self, messages):
+        for msg in messages:
+            ballot = (msg.proposal_number, msg.sender_id)
+            if msg.kind == REQUEST:
+                # Requests that reach a robot which is no longer leader are
+                # dropped; the requester times out and asks again
+                if self.is_leader:
+                    coord, sighting_turn = msg.value
+                    self.pending_requests.append((coord, msg.sender_id, sighting_turn))
+            elif msg.kind == PREPARE:
+                if ballot > self.ballot:
+                    self.ballot = ballot
+                    self.is_leader = False
+                    self.leader_id = None
+                    self.lease_expires = self.turn_count + LEASE_TURNS
+                    if self.paxos_role == 'CANDIDATE':
+                        self.paxos_role = 'IDLE'
+                        self.promises = []
+                    self.message_board[msg.sender_id].add(Message(PROMISE, msg.proposal_number, self.id))
+            elif msg.kind == PROMISE:
+                if self.paxos_role == 'CANDIDATE' and ballot[0] == self.ballot[0] and self.ballot[1] == self.id:
+                    self.promises.append(msg.sender_id)
+            elif msg.kind in (HEARTBEAT, ACCEPT) and ballot >= self.ballot:
+                self.ballot = ballot
+                self.is_leader = False
+                self.leader_id = msg.sender_id
+                self.lease_expires = self.turn_count + LEASE_TURNS
+                if self.paxos_role == 'CANDIDATE':
+                    self.paxos_role = 'IDLE'
+                    self.promises = []
+                if msg.kind == ACCEPT:
+                    for assignment in msg.value:
+                        if self.id in assignment[1]:
+                            self._adopt_assignment(assignment)
+
+    def broadcast_status(self, robot_manager):
+        status = (self.current_coord, self.is_carrying, self.role, self.goal)
+        if self.last_status is None or self.turn_count - self.last_full_status_turn >= STATUS_REFRESH_TURNS:
+            # Periodic full refresh so teammates that missed deltas converge
+            mask, values = FULL_STATUS_MASK, status
+            self.last_full_status_turn = self.turn_count
+        else:
+            mask, values = 0, []
+            for i, (new, old) in enumerate(zip(status, self.last_status)):
+                if new != old:
+                    mask |= 1 << i
+                    values.append(new)
+            if not mask:
+                return
+        self.last_status = status
+        self.status_seq += 1
+        self.broadcast_board.append((self.id, StatusUpdate(self.id, self.status_seq, mask, tuple(values))))
 
     def take_action(self, action, grid):
+        self.previous_coord = self.current_coord
         if isinstance(action, tuple) and action[0] == "TURN":
             _, direction = action
+            if direction != self.facing:
+                # Robots watching this cell see the new facing
+                grid.touch(self.current_coord)
             self.turn(direction)
             self.action_history.append(action)
         elif action == "MOVE":
@@ -329,6 +588,7 @@ class Robot:
             self.action_history.append(action)
         
         self.coord_history.append(self.current_coord)
+        self.pickup_streak = self.pickup_streak + 1 if action == "PICK_UP" else 0
         self.turn_count += 1
 
     def turn(self, direction):
@@ -355,7 +615,7 @@ class Robot:
             self.role = 'CARRIER'
 
     def drop_gold(self):
-        # print(f"{self.id} has DROPPED a GOLD BAR at {self.coord_history[self.turn_count - 1]}")
+        # print(f"{self.id} has DROPPED a GOLD BAR at {self.previous_coord}")
         self.is_carrying = False
         self.goal = None
         self.role = None
@@ -363,7 +623,7 @@ class Robot:
         self.expected_partner = None
         self.aligned_for_pickup = False
         self.wait_turn_counter = 0
-        return self.coord_history[self.turn_count - 1]
+        return self.previous_coord
 
     def score_gold(self):
         # print(f"{self.id} has SCORED!")
@@ -376,25 +636,7 @@ class Robot:
         self.wait_turn_counter = 0
 
     def _get_observable_cells(self, grid_width, grid_height):
-        observable = []
-        x, y = self.current_coord
-
-        patterns = {
-            'UP':    [(-1,1), (0,1), (1,1), (-2,2), (-1,2), (0,2), (1,2), (2,2)],
-            'DOWN':  [(-1,-1), (0,-1), (1,-1), (-2,-2), (-1,-2), (0,-2), (1,-2), (2,-2)],
-            'RIGHT': [(1,-1), (1,0), (1,1), (2,-2), (2,-1), (2,0), (2,1), (2,2)],
-            'LEFT':  [(-1,-1), (-1,0), (-1,1), (-2,-2), (-2,-1), (-2,0), (-2,1), (-2,2)],
-        }
-
-        rel_coords = patterns.get(self.facing, [])
-        all_rel_coords = rel_coords + [(0, 0)]
-        
-        for dx, dy in all_rel_coords:
-            obs_x, obs_y = x + dx, y + dy
-            if 0 <= obs_x < grid_width and 0 <= obs_y < grid_height:
-                observable.append((obs_x, obs_y))
-        
-        return observable
+        return get_visibility_index(grid_width, grid_height).get(self.current_coord, self.facing)
 
     def _get_partner_from_accepted_value(self):
         if self.accepted_value and len(self.accepted_value) > 1:
@@ -406,45 +648,55 @@ class Robot:
     def _is_partner_at_location(self, partner_id, location):
         if location in self.visible_robots:
             for robot_id, team, facing in self.visible_robots[location]:
-                if robot_id == partner_id:
+                if robot_id == partner_id and team == self.team:
                     return True, facing
         return False, None
     
     def _calculate_desired_facing(self):
         if not self.goal:
             return self.facing
-        
-        target_coord = self.deposit_box_coord
+        # Pairs line up along the first leg of the route to the deposit box
+        if self.navigation is not None:
+            return self.navigation.facing_towards(self.current_coord, self.deposit_box_coord)
         x, y = self.current_coord
-        target_x, target_y = target_coord
-        
-        dx = target_x - x
-        dy = target_y - y
-        
-        if abs(dx) > abs(dy):
-            return 'RIGHT' if dx > 0 else 'LEFT'
-        else:
-            return 'UP' if dy > 0 else 'DOWN'
+        return preferred_facing(self.deposit_box_coord[0] - x, self.deposit_box_coord[1] - y)
     
     def observe(self, grid):
-        self.observable_cells = self._get_observable_cells(grid.width, grid.height)
-        # print(f"Robot {self.id} at {self.current_coord} facing {self.facing} observes: {self.observable_cells}")
-        self.knowledge_base.clear()
-        self.visible_robots.clear()
-        for coord in self.observable_cells:
+        observable_cells = self._get_observable_cells(grid.width, grid.height)
+        # print(f"Robot {self.id} at {self.current_coord} facing {self.facing} observes: {observable_cells}")
+        gold_seen = {}
+        visible_robots = {}
+        for coord in observable_cells:
             cell = grid.get_cell(coord)
             if cell:
-                self.knowledge_base[coord] = cell
+                gold_seen[coord] = cell.get_gold_amount() or 0
                 robots_at_coord = []
                 for robot in cell.red_robots:
                     robots_at_coord.append((robot.id, robot.team, robot.facing))
                 for robot in cell.blue_robots:
                     robots_at_coord.append((robot.id, robot.team, robot.facing))
                 if robots_at_coord:
-                    self.visible_robots[coord] = robots_at_coord
+                    visible_robots[coord] = robots_at_coord
+        if self.beliefs is None:
+            self.beliefs = BeliefMap(grid.width, grid.height)
+        self.set_observation(observable_cells, gold_seen, visible_robots, grid.clock)
+
+    def set_observation(self, observable_cells, gold_seen, visible_robots, stamp):
+        # gold_seen: {coord: gold amount} for the cells in view. Only amounts
+        # are kept, so decisions go by what the robot saw, not the live grid.
+        self.observable_cells = observable_cells
+        self.beliefs.observe(self.turn_count, gold_seen)
+        self.visible_robots = visible_robots
+        self.view_stamp = stamp
+
+    def keep_observation(self, stamp):
+        # Nothing in view changed since view_stamp: the last observation still
+        # holds, it only counts as seen again this turn
+        self.beliefs.refresh(self.turn_count, self.observable_cells)
+        self.view_stamp = stamp
 
     def __str__(self):
         carrying_status = ""
         if self.is_carrying:
-            carrying_status = f" is CARRYING with {self.pair_id}"
-        return f"{self.id}({self.role}) is at {self.current_coord} facing {self.facing}{carrying_status}"
\ No newline at end of file
+            carrying_status = f" is CARRYING with {display_name(self.team, self.pair_id)}"
+        return f"{self.name}({self.role}) is at {self.current_coord} facing {self.facing}{carrying_status}"
\ No newline at end of file
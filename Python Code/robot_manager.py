@@ -1,19 +1,31 @@
 from robot import Robot
+from robot_state import RobotStateTable
 
 class RobotManager:
     def __init__(self, team, robots, message_board):
         self.team = team
         self.robots = robots
         self.message_board = message_board
+        # The robot list is built once since the team never changes during a
+        # run. The state table is only filled in when a batch reader asks.
+        self.state_table = RobotStateTable(list(robots))
+        self.robot_list = [robots[robot_id] for robot_id in self.state_table.ids]
 
     def get_robots(self):
-        return list(self.robots.values())
+        return self.robot_list
 
     def get_robot_by_id(self, id):
         return self.robots.get(id)
 
+    def get_state_table(self):
+        # The team's current state as arrays, for metrics, env and batched
+        # readers. Refreshed on every call, so keep the result only as long as
+        # no robot acts.
+        self.state_table.sync(self.robot_list)
+        return self.state_table
+
     def get_carrying_robots(self):
-        return [robot for robot in self.robots.values() if robot.is_carrying]
+        return [robot for robot in self.robot_list if robot.is_carrying]
 
     def pickup_gold(self, id_1, id_2):
         robot_1 = self.get_robot_by_id(id_1)
@@ -24,4 +36,4 @@ class RobotManager:
 
         robot_1.pickup(id_2)
         robot_2.pickup(id_1)
-        return True
\ No newline at end of file
+        return True
@@ -0,0 +1,56 @@
+import numpy as np
+
+FACINGS = ("UP", "DOWN", "LEFT", "RIGHT")
+FACING_CODES = {facing: i for i, facing in enumerate(FACINGS)}
+ROLES = (None, "HELPER", "CARRIER")
+ROLE_CODES = {role: i for i, role in enumerate(ROLES)}
+NONE = -1
+OTHER_TABLE = -2  # pair is not in this table; its id is kept in other_pairs
+
+class RobotStateTable:
+    # Struct-of-arrays copy of one team's state: row i holds robot ids[i].
+    # Robots keep their own attributes, which decisions read constantly; sync()
+    # copies them over in one pass for readers that want whole columns.
+    def __init__(self, ids):
+        n = len(ids)
+        self.ids = list(ids)
+        self.rows = {robot_id: row for row, robot_id in enumerate(self.ids)}
+        self.x = np.zeros(n, dtype=np.int32)
+        self.y = np.zeros(n, dtype=np.int32)
+        self.facing = np.zeros(n, dtype=np.int8)
+        self.carrying = np.zeros(n, dtype=bool)
+        self.role = np.zeros(n, dtype=np.int8)
+        self.goal_x = np.full(n, NONE, dtype=np.int32)
+        self.goal_y = np.full(n, NONE, dtype=np.int32)
+        self.pair = np.full(n, NONE, dtype=np.int32)
+        self.other_pairs = {}
+
+    def sync(self, robots):
+        # robots in row order
+        coords = [robot.current_coord for robot in robots]
+        self.x[:] = [x for x, _ in coords]
+        self.y[:] = [y for _, y in coords]
+        self.facing[:] = [FACING_CODES[robot.facing] for robot in robots]
+        self.carrying[:] = [robot.is_carrying for robot in robots]
+        self.role[:] = [ROLE_CODES[robot.role] for robot in robots]
+        goals = [robot.goal or (NONE, NONE) for robot in robots]
+        self.goal_x[:] = [x for x, _ in goals]
+        self.goal_y[:] = [y for _, y in goals]
+        self.pair.fill(NONE)
+        self.other_pairs.clear()
+        for row, robot in enumerate(robots):
+            if robot.pair_id is not None:
+                self.set_pair(row, robot.pair_id)
+
+    def set_pair(self, row, pair_id):
+        self.other_pairs.pop(row, None)
+        if pair_id is None:
+            self.pair[row] = NONE
+        elif pair_id in self.rows:
+            self.pair[row] = self.rows[pair_id]
+        else:
+            self.pair[row] = OTHER_TABLE
+            self.other_pairs[row] = pair_id
+
+    def __len__(self):
+        return len(self.ids)
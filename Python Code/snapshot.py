@@ -0,0 +1,56 @@
+import multiprocessing
+import pickle
+import random
+import zlib
+
+class WorldSnapshot:
+    # Full world state (grid, robots, boards, message queues, scores) plus the
+    # global RNG state, pickled as one graph so the references between cells,
+    # robots and boards survive, then compressed.
+    def __init__(self, data):
+        self.data = data
+
+    def size(self):
+        return len(self.data)
+
+    def to_bytes(self):
+        return self.data
+
+    @staticmethod
+    def from_bytes(data):
+        return WorldSnapshot(data)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return WorldSnapshot(f.read())
+
+def take_snapshot(world):
+    state = (world, random.getstate())
+    return WorldSnapshot(zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1))
+
+def restore_snapshot(snapshot, restore_rng=True):
+    world, rng_state = pickle.loads(zlib.decompress(snapshot.data))
+    if restore_rng:
+        random.setstate(rng_state)
+    return world
+
+def _run_branch(args):
+    data, branch_fn, branch_args = args
+    world = restore_snapshot(WorldSnapshot(data))
+    return branch_fn(world, *branch_args)
+
+def fork_branches(snapshot, branch_fn, branch_args, workers=None):
+    # Runs branch_fn(world, *args) on a fresh copy of the snapshot for every
+    # entry of branch_args. Only the snapshot bytes are sent to the workers, so
+    # a branch costs one restore instead of a rerun from turn 0. branch_fn must
+    # be a module-level function when workers is not 1.
+    jobs = [(snapshot.data, branch_fn, tuple(args)) for args in branch_args]
+    if workers == 1:
+        return [_run_branch(job) for job in jobs]
+    with multiprocessing.Pool(processes=workers) as pool:
+        return pool.map(_run_branch, jobs)
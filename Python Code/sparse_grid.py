@@ -0,0 +1,167 @@
+import math
+import random
+from cell import Cell
+from grid import Grid
+
+CHUNK_SIZE = 64
+# Cell versions a chunk keeps before folding them into one version for the
+# whole chunk, which bounds the table however much of the map robots visit
+CHUNK_VERSION_LIMIT = 256
+
+class SparseCell(Cell):
+    # Cell that lives in a SparseGrid. Cells for empty coords are handed out
+    # unattached; the first change stores them in their chunk, and they are
+    # dropped again once they hold nothing.
+    def __init__(self, grid, coord):
+        super().__init__(coord, 0, 0)
+        self.grid = grid
+
+    def is_empty(self):
+        return self.content is None and not self.red_robots and not self.blue_robots
+
+    def add_bot(self, robot):
+        self.grid._attach(self)
+        super().add_bot(robot)
+
+    def remove_bot(self, robot):
+        super().remove_bot(robot)
+        self.grid._prune(self)
+
+    def remove_gold(self):
+        super().remove_gold()
+        self.grid._prune(self)
+
+    def add_gold(self):
+        self.grid._attach(self)
+        super().add_gold()
+
+    def set_deposit_box(self, team):
+        self.grid._attach(self)
+        super().set_deposit_box(team)
+
+class SparseGrid(Grid):
+    # Only cells with gold, a deposit box or robots exist. They are kept in
+    # CHUNK_SIZE x CHUNK_SIZE chunks keyed by (x // CHUNK_SIZE, y // CHUNK_SIZE),
+    # so construction and memory scale with what is on the map, not its area.
+    def __init__(self, width, height, p_gold, max_gold):
+        self.width = width
+        self.height = height
+        self.chunks = {}
+        self.dirty_coords = None  # set by a renderer, see Grid
+        self.clock = 0
+        self.versions = {}       # chunk key -> {coord: version}
+        self.version_floor = {}  # chunk key -> version of every coord not in its dict
+        self._place_gold(p_gold, max_gold)
+
+    def _place_gold(self, p_gold, max_gold):
+        # Walk the cells in the same top-row-first order as Grid, but jump
+        # straight to the next gold cell with a geometric skip instead of
+        # drawing once per cell. The gold layout has the same distribution as
+        # Grid's, though a given seed gives a different map.
+        if p_gold <= 0:
+            return
+        n_cells = self.width * self.height
+        log_q = math.log(1 - p_gold) if p_gold < 1 else None
+        i = -1
+        while True:
+            i += 1 if log_q is None else 1 + int(math.log(1 - random.random()) / log_q)
+            if i >= n_cells:
+                break
+            row, x = divmod(i, self.width)
+            cell = SparseCell(self, (x, self.height - row - 1))
+            cell.content = "GoldBars"
+            cell.content_value = random.randint(1, max_gold)
+            self._attach(cell)
+
+    def _chunk_key(self, coord):
+        return coord[0] // CHUNK_SIZE, coord[1] // CHUNK_SIZE
+
+    def _attach(self, cell):
+        chunk = self.chunks.setdefault(self._chunk_key(cell.coord), {})
+        chunk.setdefault(cell.coord, cell)
+
+    def _prune(self, cell):
+        if not cell.is_empty():
+            return
+        key = self._chunk_key(cell.coord)
+        chunk = self.chunks.get(key)
+        if chunk is not None and chunk.get(cell.coord) is cell:
+            del chunk[cell.coord]
+            if not chunk:
+                del self.chunks[key]
+
+    def touch(self, coord):
+        self.clock += 1
+        key = self._chunk_key(coord)
+        versions = self.versions.get(key)
+        if versions is None:
+            versions = self.versions[key] = {}
+        elif len(versions) >= CHUNK_VERSION_LIMIT and coord not in versions:
+            # Folding can only make a coord look newer than it is, which costs
+            # a robot a needless re-observation but never a missed change
+            self.version_floor[key] = max(versions.values())
+            versions.clear()
+        versions[coord] = self.clock
+
+    def get_version(self, coord):
+        key = self._chunk_key(coord)
+        versions = self.versions.get(key)
+        floor = self.version_floor.get(key, 0)
+        return versions.get(coord, floor) if versions is not None else floor
+
+    def changed_since(self, coords, stamp):
+        if self.clock <= stamp:
+            return False
+        for coord in coords:
+            if self.get_version(coord) > stamp:
+                return True
+        return False
+
+    def get_cell(self, coord):
+        x, y = coord
+        if 0 <= x < self.width and 0 <= y < self.height:
+            chunk = self.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+            cell = chunk.get(coord) if chunk is not None else None
+            return cell if cell is not None else SparseCell(self, coord)
+        return None
+
+    def cells(self):
+        for chunk in self.chunks.values():
+            yield from chunk.values()
+
+    def cell_count(self):
+        return sum(len(chunk) for chunk in self.chunks.values())
+
+    def gold_cells(self):
+        # Only the stored cells can hold gold, so this never walks the area
+        found = []
+        for cell in self.cells():
+            amount = cell.get_gold_amount()
+            if amount:
+                found.append((cell.coord, amount))
+        found.sort(key=lambda entry: (entry[0][1], entry[0][0]))
+        return found
+
+    def get_total_gold(self):
+        return sum(cell.get_gold_amount() or 0 for cell in self.cells())
+
+    def get_occupancy(self, team=None):
+        occupancy = [[0] * self.width for _ in range(self.height)]
+        for cell in self.cells():
+            x, y = cell.coord
+            if team != "BLUE":
+                occupancy[y][x] += len(cell.red_robots)
+            if team != "RED":
+                occupancy[y][x] += len(cell.blue_robots)
+        return occupancy
+
+    def get_gold_map(self):
+        gold_map = [[0] * self.width for _ in range(self.height)]
+        for cell in self.cells():
+            x, y = cell.coord
+            gold_map[y][x] = cell.get_gold_amount() or 0
+        return gold_map
+
+    def _rows(self):
+        for y in range(self.height - 1, -1, -1):
+            yield [self.get_cell((x, y)) for x in range(self.width)]
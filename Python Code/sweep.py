@@ -0,0 +1,217 @@
+import argparse
+import dataclasses
+import glob
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+from batch_runner import run_episode
+from config import SimulationConfig, RobotTimeouts, TUNABLE_FIELDS, TIMEOUT_FIELDS
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sweep_cache")
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def code_version(source_dir=SOURCE_DIR):
+    # Hash of every module the simulation is built from. Any code change gives
+    # new cache keys, so stale results are never served.
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(source_dir, "*.py"))):
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def grid_search(base, space):
+    # space: {field: [values]}; one config per combination, in product order
+    names = list(space)
+    return [base.replace(**dict(zip(names, values))) for values in itertools.product(*space.values())]
+
+def random_search(base, space, n, seed=0):
+    # n configs with every field drawn independently from its values;
+    # duplicates are dropped, so fewer than n may come back for small spaces
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(n):
+        config = base.replace(**{name: rng.choice(values) for name, values in space.items()})
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+class ResultCache:
+    # One JSON file per (config, seed, code version), named by its key and
+    # fanned out over 256 subdirectories. Files are written to a temporary
+    # name and renamed, so an interrupted sweep never leaves a partial entry.
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, entry):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+def _run_job(job):
+    key, config_dict, seed = job
+    return key, run_episode(0, seed, SimulationConfig.from_dict(config_dict))
+
+class SweepResult:
+    def __init__(self, configs, runs):
+        self.configs = configs
+        self.runs = runs  # (config index, seed, episode result)
+
+    def summary(self):
+        # Per config, in sweep order: its changed fields and the mean scores
+        rows = []
+        base = SimulationConfig()
+        for index, config in enumerate(self.configs):
+            episodes = [result for i, _, result in self.runs if i == index]
+            n = len(episodes)
+            totals = [e["red_score"] + e["blue_score"] for e in episodes]
+            latencies = [e["mean_latency"] for e in episodes if e.get("mean_latency") is not None]
+            rows.append({
+                "config": changed_fields(config, base),
+                "episodes": n,
+                "mean_score": sum(totals) / n if n else None,
+                "min_score": min(totals) if n else None,
+                "max_score": max(totals) if n else None,
+                "mean_latency": sum(latencies) / len(latencies) if latencies else None,
+            })
+        return rows
+
+    def best(self):
+        rows = [row for row in self.summary() if row["mean_score"] is not None]
+        return max(rows, key=lambda row: row["mean_score"]) if rows else None
+
+    def table(self):
+        lines = ["{:>10} {:>6} {:>6} {:>6} {:>8}  {}".format("MEAN", "MIN", "MAX", "EPS", "LATENCY", "CONFIG")]
+        for row in sorted(self.summary(), key=lambda row: -(row["mean_score"] or 0)):
+            latency = f"{row['mean_latency']:.2f}" if row["mean_latency"] is not None else "-"
+            lines.append("{:>10.2f} {:>6} {:>6} {:>6} {:>8}  {}".format(
+                row["mean_score"] or 0, row["min_score"], row["max_score"], row["episodes"], latency,
+                " ".join(f"{name}={value}" for name, value in row["config"].items()) or "(defaults)"))
+        return "\n".join(lines)
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(),
+                       "runs": [{"config": self.configs[i].to_dict(), "seed": seed, "result": result}
+                                for i, seed, result in self.runs]}, f, indent=2)
+
+def changed_fields(config, base):
+    values = {name: getattr(config, name) for name in TUNABLE_FIELDS if name not in TIMEOUT_FIELDS}
+    values.update(dataclasses.asdict(config.timeouts))
+    base_values = {name: getattr(base, name) for name in TUNABLE_FIELDS if name not in TIMEOUT_FIELDS}
+    base_values.update(dataclasses.asdict(base.timeouts))
+    return {name: value for name, value in values.items() if value != base_values[name]}
+
+def run_sweep(configs, seeds, cache=None, workers=None, log=None):
+    # Runs every (config, seed) pair that is not already cached. Each result is
+    # stored as soon as it arrives, so rerunning an interrupted sweep only
+    # simulates what is still missing, and repeating a finished one is free.
+    cache = cache or ResultCache()
+    version = code_version()
+    runs = []
+    pending = {}  # key -> (config dict, seed, [(config index, seed)] waiting on it)
+    for index, config in enumerate(configs):
+        for seed in seeds:
+            key = config.key(seed, version)
+            entry = cache.get(key)
+            if entry is not None:
+                runs.append((index, seed, entry["result"]))
+            else:
+                pending.setdefault(key, (config.to_dict(), seed, []))[2].append((index, seed))
+    jobs = [(key, config_dict, seed) for key, (config_dict, seed, _) in pending.items()]
+    if log:
+        log(f"{len(runs)} cached, {len(jobs)} to run")
+
+    def store(done, key, result):
+        config_dict, seed, slots = pending[key]
+        cache.put(key, {"config": config_dict, "seed": seed, "code": version, "result": result})
+        runs.extend((index, slot_seed, result) for index, slot_seed in slots)
+        if log:
+            log(f"{done}/{len(jobs)}")
+
+    if workers == 1 or len(jobs) <= 1:
+        for done, job in enumerate(jobs, 1):
+            store(done, *_run_job(job))
+    elif jobs:
+        with multiprocessing.Pool(processes=workers) as pool:
+            for done, (key, result) in enumerate(pool.imap_unordered(_run_job, jobs), 1):
+                store(done, key, result)
+    runs.sort(key=lambda run: (run[0], run[1]))
+    return SweepResult(configs, runs)
+
+def parse_value(name, text):
+    if name in TIMEOUT_FIELDS:
+        default = getattr(RobotTimeouts(), name)
+    else:
+        default = getattr(SimulationConfig(), name)
+    if name == "message_delay":
+        low, high = text.split("-")
+        return int(low), int(high)
+    if text == "None":
+        return None
+    if isinstance(default, bool):
+        return text.lower() in ("1", "true", "yes")
+    if isinstance(default, int):
+        return int(text)
+    if isinstance(default, float):
+        return float(text)
+    return text
+
+def parse_space(specs):
+    # ["paxos=5,10,20", "message_delay=1-3,1-5"] -> {"paxos": [5, 10, 20], ...}
+    space = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in TUNABLE_FIELDS:
+            raise ValueError(f"Unknown field {name!r}, expected one of {TUNABLE_FIELDS}")
+        space[name] = [parse_value(name, value) for value in values.split(",")]
+    return space
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sweep simulation settings with an on-disk result cache")
+    parser.add_argument("space", nargs="+", help="field=value1,value2,... (message_delay values as low-high)")
+    parser.add_argument("--random", type=int, default=None, metavar="N",
+                        help="sample N configs instead of the full grid")
+    parser.add_argument("--search-seed", type=int, default=0, help="seed for --random sampling")
+    parser.add_argument("--seeds", type=int, default=10, help="episodes per config")
+    parser.add_argument("--base-seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--turns", type=int, default=None, help="turns per episode (default: config default)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--cache", default=CACHE_DIR)
+    parser.add_argument("--json", help="write the summary and every run to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    base = SimulationConfig()
+    if args.turns is not None:
+        base = base.replace(turns=args.turns)
+    space = parse_space(args.space)
+    if args.random is not None:
+        configs = random_search(base, space, args.random, args.search_seed)
+    else:
+        configs = grid_search(base, space)
+    seeds = range(args.base_seed, args.base_seed + args.seeds)
+    result = run_sweep(configs, seeds, ResultCache(args.cache), args.workers, log=print)
+    print(result.table())
+    if args.json:
+        result.to_json(args.json)
+
+if __name__ == "__main__":
+    main()
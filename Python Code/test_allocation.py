@@ -0,0 +1,43 @@
+import random
+from allocation import GreedyAllocator, AuctionAllocator, HungarianAllocator, _distance
+
+ENGINES = (AuctionAllocator, HungarianAllocator)
+
+def walk(robots, result):
+    return sum(_distance(robots[robot_id], coord) for coord, pair in result.items() for robot_id in pair)
+
+def check_pairs(robots, golds, result):
+    used = [robot_id for pair in result.values() for robot_id in pair]
+    assert len(used) == len(set(used))
+    assert set(used) <= set(robots)
+    assert set(result) <= set(golds)
+    assert all(len(pair) == 2 for pair in result.values())
+
+def test_engines_pair_robots_when_slots_outnumber_them():
+    # One robot on each gold is the cheapest slot assignment here, but it
+    # leaves every gold half-covered; greedy pairs them on the first gold
+    cases = [
+        ({0: (0, 0), 1: (10, 0)}, [(0, 1), (10, 1)]),
+        ({i: (10 * i, 0) for i in range(4)}, [(10 * i, 1) for i in range(4)]),
+    ]
+    for robots, golds in cases:
+        greedy = GreedyAllocator().allocate(robots, golds)
+        for engine in ENGINES:
+            result = engine().allocate(robots, golds)
+            check_pairs(robots, golds, result)
+            assert len(result) == len(greedy)
+            assert walk(robots, result) <= walk(robots, greedy)
+
+def test_engines_cover_as_much_gold_as_greedy():
+    rng = random.Random(0)
+    engines = [engine() for engine in ENGINES]
+    for _ in range(100):
+        size = rng.choice([10, 50])
+        robots = {i: (rng.randrange(size), rng.randrange(size)) for i in range(rng.randint(0, 12))}
+        golds = list({(rng.randrange(size), rng.randrange(size)) for _ in range(rng.randint(0, 8))})
+        greedy = GreedyAllocator().allocate(robots, golds)
+        # The engines keep state between calls, as they do in a robot
+        for engine in engines:
+            result = engine.allocate(robots, golds)
+            check_pairs(robots, golds, result)
+            assert len(result) == len(greedy) == min(len(golds), len(robots) // 2)
@@ -0,0 +1,25 @@
+import random
+from history import read_archive
+from world import World
+
+def test_archive_keeps_teams_apart(tmp_path):
+    # Both teams have a robot 0; each robot's archived coords followed by the
+    # ones still in its window must be one unbroken walk from its start
+    path = tmp_path / "history.txt"
+    random.seed(3)
+    world = World(10, 10, 0.1, 3, 3, verbose=False, history_window=5, history_archive_path=str(path))
+    starts = {(robot.team, robot.id): robot.current_coord
+              for robot in world.red_team.get_robots() + world.blue_team.get_robots()}
+    for _ in range(40):
+        world.next_turn()
+    world.close()
+
+    archive = read_archive(path)
+    for robot in world.red_team.get_robots() + world.blue_team.get_robots():
+        entries = archive[(robot.team, robot.id, "coord")]
+        assert [index for index, _ in entries] == list(range(len(entries)))
+        assert len(entries) + len(robot.coord_history) == robot.coord_history.total
+        walk = [coord for _, coord in entries] + list(robot.coord_history)
+        assert walk[0] == starts[(robot.team, robot.id)]
+        assert all(abs(x1 - x2) + abs(y1 - y2) <= 1 for (x1, y1), (x2, y2) in zip(walk, walk[1:]))
+        assert len(archive[(robot.team, robot.id, "action")]) == robot.action_history.total - len(robot.action_history)
@@ -0,0 +1,29 @@
+import random
+import tracemalloc
+from world import World
+from sparse_grid import SparseGrid
+
+# A 2000x2000 SparseGrid world has to cost what is on it, not its area; a
+# single full-grid int8 table would already be 4 MB
+SIZE = 2000
+PEAK_BUDGET_MB = 16
+
+def test_sparse_world_memory_scales_with_content():
+    random.seed(0)
+    tracemalloc.start()
+    try:
+        world = World(SIZE, SIZE, 0.0005, 3, 10, verbose=False, grid_class=SparseGrid)
+        for _ in range(50):
+            world.next_turn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak / 2 ** 20 < PEAK_BUDGET_MB
+
+def test_headless_grid_tracks_no_dirty_cells():
+    # Only a renderer clears dirty_coords, so without one nothing may be kept
+    random.seed(0)
+    world = World(200, 200, 0.01, 3, 10, verbose=False, grid_class=SparseGrid)
+    for _ in range(50):
+        world.next_turn()
+    assert world.grid.dirty_coords is None
@@ -0,0 +1,50 @@
+import random
+from navigation import NavigationCache, FACINGS, step_towards
+from world import World
+
+# Not a multiple of CHUNK_SIZE, so edge tiles are clipped
+WIDTH, HEIGHT = 70, 130
+
+def test_field_matches_manhattan_route():
+    cache = NavigationCache(WIDTH, HEIGHT)
+    rng = random.Random(0)
+    for _ in range(20):
+        target = (rng.randrange(WIDTH), rng.randrange(HEIGHT))
+        for _ in range(200):
+            coord = (rng.randrange(WIDTH), rng.randrange(HEIGHT))
+            assert cache.distance(coord, target) == abs(coord[0] - target[0]) + abs(coord[1] - target[1])
+            for facing in FACINGS:
+                assert cache.step(coord, facing, target) == step_towards(coord, facing, target)
+
+def test_gold_fields_are_least_recently_used():
+    cache = NavigationCache(WIDTH, HEIGHT, gold_cache_size=2)
+    a, b, c = (1, 1), (2, 2), (3, 3)
+    for target in (a, b, a, c):
+        cache.get_field(target)
+    assert list(cache.gold_fields) == [a, c]
+
+def test_moved_deposit_gets_a_new_field():
+    cache = NavigationCache(WIDTH, HEIGHT, [(0, 0), (60, 100)])
+    kept = cache.get_field((60, 100))
+    cache.set_deposits([(60, 100), (69, 129)])
+    assert set(cache.deposit_fields) == {(60, 100), (69, 129)}
+    assert cache.get_field((60, 100)) is kept
+    assert cache.step((69, 0), "UP", (69, 129)) == "MOVE"
+    assert cache.distance((69, 0), (69, 129)) == 129
+
+def test_field_is_dropped_when_its_gold_is_gone():
+    random.seed(0)
+    world = World(20, 20, 0.1, 1, 10, verbose=False)
+    (coord, amount), = world.grid.gold_cells()[:1]
+    navigation = world.navigation["RED"]
+    before = navigation.fields_built
+    navigation.get_field(coord)
+    robots = world.red_team.get_robots()
+    for k in range(amount):
+        assert coord in navigation.gold_fields
+        world.pickup_check = {coord: [(robots[2 * k].id, "RED"), (robots[2 * k + 1].id, "RED")]}
+        world.check_pickup_logic()
+    assert coord not in navigation.gold_fields
+    # Asking again builds a fresh field rather than reviving the old one
+    navigation.get_field(coord)
+    assert navigation.fields_built == before + 2
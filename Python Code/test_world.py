@@ -0,0 +1,16 @@
+import random
+import threading
+from world import World
+
+def test_close_shuts_down_decision_threads():
+    # Worlds are rebuilt over and over by GoldEnv.reset; none may leave workers behind
+    before = threading.active_count()
+    for seed in range(5):
+        random.seed(seed)
+        world = World(10, 10, 0.1, 3, 4, verbose=False, pipeline="two_phase", decision_workers=4)
+        for _ in range(5):
+            world.next_turn()
+        assert world.decision_pool is not None
+        world.close()
+        assert world.decision_pool is None
+    assert threading.active_count() == before
@@ -0,0 +1,245 @@
+import struct
+
+# File layout (little-endian):
+#   header: MAGIC, version, width, height, keyframe interval, robot table
+#   initial keyframe block, then one block per turn
+#   block:  kind 'K' or 'T', turn, body length, then the body records
+# Robots are referred to by their index in the robot table (red team first).
+
+MAGIC = b"GTRC"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHHH")       # magic, version, width, height, keyframe interval, n robots
+ROBOT_ENTRY = struct.Struct("<BB")        # team, length of id
+BLOCK = struct.Struct("<cII")             # kind, turn, body length
+BLOCK_TURN = b"T"
+BLOCK_KEYFRAME = b"K"
+
+REC_ACTION = 1
+REC_PICKUP = 2
+REC_FUMBLE = 3
+REC_DEPOSIT = 4
+REC_SCORE = 5
+REC_MESSAGES = 6
+REC_KEYFRAME = 7
+
+ACTION = struct.Struct("<BHBHHBB")        # rec, robot, action, x, y, facing, carrying
+PAIR_EVENT = struct.Struct("<BHHHH")      # rec, robot, robot, x, y
+SCORE = struct.Struct("<BII")             # rec, red score, blue score
+MESSAGES = struct.Struct("<BBBI")         # rec, team, message kind, count
+KEYFRAME_HEAD = struct.Struct("<BIIII")   # rec, red score, blue score, n gold cells, n robots
+GOLD_ENTRY = struct.Struct("<HHH")        # x, y, amount
+ROBOT_STATE = struct.Struct("<HHBBH")     # x, y, facing, carrying, pair (NO_ROBOT if none)
+DEPOSITS = struct.Struct("<HHHH")         # red x, red y, blue x, blue y
+
+NO_ROBOT = 0xFFFF
+TEAMS = ("RED", "BLUE")
+FACINGS = ("UP", "DOWN", "LEFT", "RIGHT")
+FACING_CODES = {facing: i for i, facing in enumerate(FACINGS)}
+ACTIONS = ("WAIT", "MOVE", "PICK_UP", "TURN_UP", "TURN_DOWN", "TURN_LEFT", "TURN_RIGHT", "OTHER")
+
+def encode_action(action):
+    if action is None:
+        return 0
+    if action == "MOVE":
+        return 1
+    if action == "PICK_UP":
+        return 2
+    if isinstance(action, tuple) and action[0] == "TURN" and action[1] in FACING_CODES:
+        return 3 + FACING_CODES[action[1]]
+    return 7
+
+class TraceWriter:
+    def __init__(self, path, world, keyframe_interval=100, buffer_size=1 << 16):
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.keyframe_interval = keyframe_interval
+        self.robots = world.red_team.get_robots() + world.blue_team.get_robots()
+        self.index = {(robot.team, robot.id): i for i, robot in enumerate(self.robots)}
+        self.body = bytearray()
+
+        self.file.write(HEADER.pack(MAGIC, VERSION, world.width, world.height, keyframe_interval, len(self.robots)))
+        for robot in self.robots:
+            name = robot.name.encode()
+            self.file.write(ROBOT_ENTRY.pack(TEAMS.index(robot.team), len(name)) + name)
+        self.file.write(DEPOSITS.pack(*world.red_deposit_box, *world.blue_deposit_box))
+        self._write_block(BLOCK_KEYFRAME, world.turn_count, self._keyframe(world))
+
+    def _robot(self, robot):
+        return self.index[(robot.team, robot.id)]
+
+    def _keyframe(self, world):
+        gold = [GOLD_ENTRY.pack(x, y, amount) for (x, y), amount in world.grid.gold_cells()]
+        out = bytearray(KEYFRAME_HEAD.pack(REC_KEYFRAME, world.red_score, world.blue_score, len(gold), len(self.robots)))
+        out += b"".join(gold)
+        for robot in self.robots:
+            pair = self.index.get((robot.team, robot.pair_id), NO_ROBOT) if robot.pair_id is not None else NO_ROBOT
+            out += ROBOT_STATE.pack(*robot.current_coord, FACING_CODES.get(robot.facing, 0), robot.is_carrying, pair)
+        return out
+
+    def _write_block(self, kind, turn, body):
+        self.file.write(BLOCK.pack(kind, turn, len(body)))
+        self.file.write(body)
+
+    def record_action(self, robot, action):
+        self.body += ACTION.pack(REC_ACTION, self._robot(robot), encode_action(action), *robot.current_coord,
+                                 FACING_CODES.get(robot.facing, 0), robot.is_carrying)
+
+    def record_pickup(self, robot_1, robot_2, coord):
+        self.body += PAIR_EVENT.pack(REC_PICKUP, self._robot(robot_1), self._robot(robot_2), *coord)
+
+    def record_fumble(self, robot_1, robot_2, coord):
+        self.body += PAIR_EVENT.pack(REC_FUMBLE, self._robot(robot_1), self._robot(robot_2), *coord)
+
+    def record_deposit(self, robot_1, robot_2, coord):
+        self.body += PAIR_EVENT.pack(REC_DEPOSIT, self._robot(robot_1), self._robot(robot_2), *coord)
+
+    def record_messages(self, team, counts):
+        for kind, count in counts.items():
+            self.body += MESSAGES.pack(REC_MESSAGES, TEAMS.index(team), kind, count)
+
+    def end_turn(self, world):
+        self.body += SCORE.pack(REC_SCORE, world.red_score, world.blue_score)
+        self._write_block(BLOCK_TURN, world.turn_count, self.body)
+        self.body = bytearray()
+        if self.keyframe_interval and world.turn_count % self.keyframe_interval == 0:
+            self._write_block(BLOCK_KEYFRAME, world.turn_count, self._keyframe(world))
+
+    def close(self):
+        self.file.close()
+
+class ReplayState:
+    def __init__(self, width, height, red_deposit_box, blue_deposit_box):
+        self.width = width
+        self.height = height
+        self.red_deposit_box = red_deposit_box
+        self.blue_deposit_box = blue_deposit_box
+        self.turn = 0
+        self.red_score = 0
+        self.blue_score = 0
+        self.gold = {}
+        self.robots = []  # [x, y, facing, is_carrying, pair index or None]
+        self.message_counts = {}  # (team, kind) -> messages sent during this turn
+        self.last_actions = {}  # robot index -> action name for this turn
+
+    def _add_gold(self, coord):
+        if coord in (self.red_deposit_box, self.blue_deposit_box):
+            return
+        self.gold[coord] = self.gold.get(coord, 0) + 1
+
+    def _remove_gold(self, coord):
+        amount = self.gold.get(coord, 0)
+        if amount > 1:
+            self.gold[coord] = amount - 1
+        else:
+            self.gold.pop(coord, None)
+
+    def _set_carrying(self, robot, pair):
+        self.robots[robot][3] = pair is not None
+        self.robots[robot][4] = pair
+
+    def load_keyframe(self, turn, body):
+        _, self.red_score, self.blue_score, n_gold, n_robots = KEYFRAME_HEAD.unpack_from(body, 0)
+        offset = KEYFRAME_HEAD.size
+        self.gold = {}
+        for _ in range(n_gold):
+            x, y, amount = GOLD_ENTRY.unpack_from(body, offset)
+            self.gold[(x, y)] = amount
+            offset += GOLD_ENTRY.size
+        self.robots = []
+        for _ in range(n_robots):
+            x, y, facing, carrying, pair = ROBOT_STATE.unpack_from(body, offset)
+            self.robots.append([x, y, FACINGS[facing], bool(carrying), None if pair == NO_ROBOT else pair])
+            offset += ROBOT_STATE.size
+        self.turn = turn
+
+    def apply_turn(self, turn, body):
+        self.message_counts = {}
+        self.last_actions = {}
+        offset = 0
+        while offset < len(body):
+            rec = body[offset]
+            if rec == REC_ACTION:
+                _, robot, action, x, y, facing, carrying = ACTION.unpack_from(body, offset)
+                state = self.robots[robot]
+                state[0], state[1], state[2] = x, y, FACINGS[facing]
+                if not carrying:
+                    state[3], state[4] = False, None
+                self.last_actions[robot] = ACTIONS[action]
+                offset += ACTION.size
+            elif rec in (REC_PICKUP, REC_FUMBLE, REC_DEPOSIT):
+                _, robot_1, robot_2, x, y = PAIR_EVENT.unpack_from(body, offset)
+                if rec == REC_PICKUP:
+                    self._remove_gold((x, y))
+                    self._set_carrying(robot_1, robot_2)
+                    self._set_carrying(robot_2, robot_1)
+                else:
+                    if rec == REC_FUMBLE:
+                        self._add_gold((x, y))
+                    self._set_carrying(robot_1, None)
+                    self._set_carrying(robot_2, None)
+                offset += PAIR_EVENT.size
+            elif rec == REC_SCORE:
+                _, self.red_score, self.blue_score = SCORE.unpack_from(body, offset)
+                offset += SCORE.size
+            elif rec == REC_MESSAGES:
+                _, team, kind, count = MESSAGES.unpack_from(body, offset)
+                self.message_counts[(TEAMS[team], kind)] = count
+                offset += MESSAGES.size
+            else:
+                raise ValueError(f"Unknown trace record {rec} in turn {turn}")
+        self.turn = turn
+
+    def robots_at(self, coord):
+        return [i for i, state in enumerate(self.robots) if (state[0], state[1]) == coord]
+
+class TraceReplay:
+    # Rebuilds world state from a trace without running any robot logic.
+    # Blocks are indexed once on open; seeking loads the nearest keyframe at or
+    # before the target turn and applies only the turn blocks after it.
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        magic, version, self.width, self.height, self.keyframe_interval, n_robots = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} trace file")
+        offset = HEADER.size
+        self.robot_names = []
+        for _ in range(n_robots):
+            team, length = ROBOT_ENTRY.unpack_from(self.data, offset)
+            offset += ROBOT_ENTRY.size
+            self.robot_names.append((TEAMS[team], self.data[offset:offset + length].decode()))
+            offset += length
+        red_x, red_y, blue_x, blue_y = DEPOSITS.unpack_from(self.data, offset)
+        self.red_deposit_box, self.blue_deposit_box = (red_x, red_y), (blue_x, blue_y)
+        offset += DEPOSITS.size
+
+        self.turn_blocks = {}  # turn -> (body start, body end)
+        self.keyframes = []    # [(turn, body start, body end)] in turn order
+        while offset < len(self.data):
+            kind, turn, length = BLOCK.unpack_from(self.data, offset)
+            start = offset + BLOCK.size
+            if kind == BLOCK_KEYFRAME:
+                self.keyframes.append((turn, start, start + length))
+            else:
+                self.turn_blocks[turn] = (start, start + length)
+            offset = start + length
+        self.first_turn = self.keyframes[0][0]
+        self.last_turn = max(self.turn_blocks, default=self.first_turn)
+
+    def state_at(self, turn):
+        if not self.first_turn <= turn <= self.last_turn:
+            raise ValueError(f"Turn {turn} is outside the recorded range {self.first_turn}-{self.last_turn}")
+        keyframe_turn, start, end = max((k for k in self.keyframes if k[0] <= turn), key=lambda k: k[0])
+        state = ReplayState(self.width, self.height, self.red_deposit_box, self.blue_deposit_box)
+        state.load_keyframe(keyframe_turn, self.data[start:end])
+        for t in range(keyframe_turn + 1, turn + 1):
+            start, end = self.turn_blocks[t]
+            state.apply_turn(t, self.data[start:end])
+        return state
+
+    def states(self, from_turn=None):
+        state = self.state_at(self.first_turn if from_turn is None else from_turn)
+        yield state
+        for t in range(state.turn + 1, self.last_turn + 1):
+            start, end = self.turn_blocks[t]
+            state.apply_turn(t, self.data[start:end])
+            yield state
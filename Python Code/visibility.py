@@ -0,0 +1,41 @@
+FIELD_OF_VIEW = {
+    'UP':    ((-1,1), (0,1), (1,1), (-2,2), (-1,2), (0,2), (1,2), (2,2), (0,0)),
+    'DOWN':  ((-1,-1), (0,-1), (1,-1), (-2,-2), (-1,-2), (0,-2), (1,-2), (2,-2), (0,0)),
+    'RIGHT': ((1,-1), (1,0), (1,1), (2,-2), (2,-1), (2,0), (2,1), (2,2), (0,0)),
+    'LEFT':  ((-1,-1), (-1,0), (-1,1), (-2,-2), (-2,-1), (-2,0), (-2,1), (-2,2), (0,0)),
+}
+
+# Grids up to this many cells get their whole table built up front; larger
+# ones fill it in as robots visit new (coord, facing) pairs
+EAGER_MAX_CELLS = 10000
+
+class VisibilityIndex:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.table = {}
+        if width * height <= EAGER_MAX_CELLS:
+            for x in range(width):
+                for y in range(height):
+                    for facing in FIELD_OF_VIEW:
+                        self.get((x, y), facing)
+
+    def get(self, coord, facing):
+        key = (coord, facing)
+        cells = self.table.get(key)
+        if cells is None:
+            x, y = coord
+            cells = tuple(
+                (x + dx, y + dy) for dx, dy in FIELD_OF_VIEW.get(facing, ((0, 0),))
+                if 0 <= x + dx < self.width and 0 <= y + dy < self.height
+            )
+            self.table[key] = cells
+        return cells
+
+_indexes = {}
+
+def get_visibility_index(width, height):
+    index = _indexes.get((width, height))
+    if index is None:
+        index = _indexes[(width, height)] = VisibilityIndex(width, height)
+    return index
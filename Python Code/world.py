@@ -1,31 +1,158 @@
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from grid import Grid
 from robot import Robot
 from robot_manager import RobotManager
+from message_queue import MessageScheduler
+from visibility import get_visibility_index
+from navigation import NavigationCache
+from belief import BeliefMap
+from consensus import ConsensusMetrics, ConsensusTally, CONSENSUS_MODES
+from allocation import make_allocator
+from config import MESSAGE_DELAY
+from trace_log import TraceWriter
+from profiler import TurnProfiler
+from metrics import MetricsRecorder
+from snapshot import take_snapshot, restore_snapshot
+from history import HistoryArchive, HISTORY_WINDOW
+
+class MessageBox(dict):
+    # Insertion-ordered set, so message handling (and the random delays drawn
+    # for it) does not depend on hash ordering and seeded runs are repeatable
+    def add(self, message):
+        self[message] = None
+
+class Outbox(dict):
+    # Private write board used while a robot decides in the two-phase pipeline.
+    # Sparse, since a robot only writes to a few teammates per turn.
+    def __missing__(self, robot_id):
+        box = self[robot_id] = MessageBox()
+        return box
+
+def new_board(n_robots):
+    # Boards are lists indexed by robot id (ids are 0..n_robots-1 per team)
+    return [MessageBox() for _ in range(n_robots)]
 
 class World:
-    def __init__(self, width, height, p_gold, max_gold, n_robots):
-        self.grid = Grid(width, height, p_gold, max_gold)
+    def __init__(self, width, height, p_gold, max_gold, n_robots, verbose=True, grid_class=Grid,
+                 pipeline="sequential", decision_workers=None, history_window=HISTORY_WINDOW,
+                 history_archive_path=None, consensus="paxos", allocation=None, message_delay=MESSAGE_DELAY,
+                 timeouts=None):
+        if consensus not in CONSENSUS_MODES:
+            raise ValueError(f"Unknown consensus mode {consensus!r}, expected one of {CONSENSUS_MODES}")
+        self.grid = grid_class(width, height, p_gold, max_gold)
         self.width = width
         self.height = height
         self.red_score = 0
         self.blue_score = 0
+        self.verbose = verbose
 
         self.red_deposit_box, self.blue_deposit_box = self._spawn_deposit_boxes()
 
-        self.red_message_queue = {chr(ord('A') + i): [] for i in range(n_robots)}
-        self.blue_message_queue = {chr(ord('a') + i): [] for i in range(n_robots)}
+        self.message_delay = message_delay
+        self.red_message_queue = MessageScheduler()
+        self.blue_message_queue = MessageScheduler()
         
-        self.red_board_1 = {chr(ord('A') + i): set() for i in range(n_robots)}
-        self.red_board_2 = {chr(ord('A') + i): set() for i in range(n_robots)}
-        self.blue_board_1 = {chr(ord('a') + i): set() for i in range(n_robots)}
-        self.blue_board_2 = {chr(ord('a') + i): set() for i in range(n_robots)}
+        self.red_board_1 = new_board(n_robots)
+        self.red_board_2 = new_board(n_robots)
+        self.blue_board_1 = new_board(n_robots)
+        self.blue_board_2 = new_board(n_robots)
+        self.red_broadcast_board = []
+        self.blue_broadcast_board = []
         self.turn_count = 0
 
+        # Robots keep the last history_window coords/actions; older entries are
+        # spilled to the archive file when one is given
+        self.history_window = history_window
+        self.history_archive = HistoryArchive(history_archive_path) if history_archive_path else None
+
+        self.consensus = consensus
+        # Pair choice engine ("greedy", "auction" or "hungarian"); None keeps
+        # proposer + nearest idle teammate
+        self.allocation = allocation
+        self.consensus_metrics = {"RED": ConsensusMetrics(), "BLUE": ConsensusMetrics()}
+        # RobotTimeouts for every robot; None keeps the robot defaults
+        self.timeouts = timeouts
+
+        self.navigation = {}  # team -> NavigationCache
         self.red_team = self._spawn_robots(n_robots, "RED")
         self.blue_team = self._spawn_robots(n_robots, "BLUE")
 
         self.pickup_check = {}
+        self.trace = None
+        self.profiler = None
+        self.metrics = None
+
+        # "sequential": teams and robots observe, decide and act one after the
+        # other. "two_phase": everyone decides on the same frozen world, then
+        # all actions are applied together.
+        self.pipeline = pipeline
+        self.decision_workers = decision_workers
+        self.decision_pool = None
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        # kwargs are passed through for settings that are not part of a run's
+        # identity (verbose, grid_class, decision_workers, history options)
+        return cls(config.width, config.height, config.p_gold, config.max_gold, config.n_robots,
+                   pipeline=config.pipeline, consensus=config.consensus, allocation=config.allocation,
+                   message_delay=config.message_delay, timeouts=config.timeouts, **kwargs)
+
+    def start_trace(self, path, keyframe_interval=100):
+        self.trace = TraceWriter(path, self, keyframe_interval)
+
+    def stop_trace(self):
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def start_profiling(self, export_path=None, export_interval=100):
+        self.profiler = TurnProfiler(export_path, export_interval)
+        return self.profiler
+
+    def stop_profiling(self):
+        profiler, self.profiler = self.profiler, None
+        if profiler is not None and profiler.export_path:
+            profiler.export(profiler.export_path)
+        return profiler
+
+    def start_metrics(self, path=None, capacity=2500, attrs=None):
+        # Per-turn time series; written to path (if any) by stop_metrics
+        self.metrics = MetricsRecorder(self, path, capacity, attrs)
+        return self.metrics
+
+    def stop_metrics(self):
+        metrics, self.metrics = self.metrics, None
+        if metrics is not None and metrics.path:
+            metrics.flush()
+        return metrics
+
+    def close(self):
+        self.stop_trace()
+        self.stop_profiling()
+        self.stop_metrics()
+        if self.history_archive is not None:
+            self.history_archive.close()
+        if self.decision_pool is not None:
+            self.decision_pool.shutdown()
+            self.decision_pool = None
+
+    def snapshot(self):
+        return take_snapshot(self)
+
+    @staticmethod
+    def restore(snapshot, restore_rng=True):
+        return restore_snapshot(snapshot, restore_rng)
+
+    def __getstate__(self):
+        # Open trace files stay with the original world
+        state = self.__dict__.copy()
+        state["trace"] = None
+        state["profiler"] = None
+        state["metrics"] = None
+        state["decision_pool"] = None
+        return state
 
     def _spawn_deposit_boxes(self):
         red_deposit_box = (random.randint(0, self.width - 1), random.randint(0, self.height - 1))
@@ -38,22 +165,34 @@ class World:
         return red_deposit_box, blue_deposit_box
 
     def _spawn_robots(self, n_robots, team):
+        # Ids are dense ints per team, so a robot's id is also its row in the
+        # team's state table and its index on the message boards
         robots = {}
-        message_board = {}
-        first_id = 'A' if team == "RED" else 'a'
+        message_board = new_board(n_robots)
         deposit_box_coord = self.red_deposit_box if team == "RED" else self.blue_deposit_box
-        for i in range(n_robots):
-            robot_id = chr(ord(first_id) + i)
-            message_board[robot_id] = set()
+        navigation = self.navigation[team] = NavigationCache(self.width, self.height, [deposit_box_coord])
+        for robot_id in range(n_robots):
             start_coord = (random.randint(0, self.width - 1), random.randint(0, self.height - 1))
             start_facing = random.choice(["LEFT", "RIGHT", "UP", "DOWN"])
-            robot = Robot(robot_id, team, start_coord, start_facing, message_board, deposit_box_coord)
+            robot = Robot(robot_id, team, start_coord, start_facing, message_board, deposit_box_coord,
+                          self.history_window, self.history_archive)
+            robot.navigation = navigation
+            robot.beliefs = BeliefMap(self.width, self.height)
+            robot.consensus = self.consensus
+            robot.consensus_metrics = self.consensus_metrics[team]
+            if self.timeouts is not None:
+                robot.timeouts = self.timeouts
+            if self.allocation is not None:
+                robot.allocator = make_allocator(self.allocation)
             self.grid.add_robot(robot, start_coord)
             robots[robot_id] = robot
         return RobotManager(team, robots, message_board)
 
     def next_turn(self):
         self.turn_count += 1
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_turn()
 
         if self.turn_count % 2 == 1:
             red_read_board, red_write_board = self.red_board_1, self.red_board_2
@@ -62,70 +201,186 @@ class World:
             red_read_board, red_write_board = self.red_board_2, self.red_board_1
             blue_read_board, blue_write_board = self.blue_board_2, self.blue_board_1
 
-        for robot_id in red_write_board:
-            red_write_board[robot_id].clear()
-        for robot_id in blue_write_board:
-            blue_write_board[robot_id].clear()
-        for robot_id in red_read_board:
-            red_read_board[robot_id].clear()
-        for robot_id in blue_read_board:
-            blue_read_board[robot_id].clear()
+        for board in (red_write_board, blue_write_board, red_read_board, blue_read_board):
+            for box in board:
+                box.clear()
+        if profiler is not None:
+            profiler.mark("clear_boards")
 
-        self._deliver_queued_messages(red_read_board, self.red_message_queue)
-        self._deliver_queued_messages(blue_read_board, self.blue_message_queue)
+        self._deliver_queued_messages(red_read_board, self.red_message_queue, self.red_team)
+        self._deliver_queued_messages(blue_read_board, self.blue_message_queue, self.blue_team)
+        if profiler is not None:
+            profiler.mark("deliver_messages")
 
         for robot in self.red_team.get_robots():
             robot.read_board = red_read_board
             robot.message_board = red_write_board
+            robot.broadcast_board = self.red_broadcast_board
         for robot in self.blue_team.get_robots():
             robot.read_board = blue_read_board
             robot.message_board = blue_write_board
+            robot.broadcast_board = self.blue_broadcast_board
 
         for robot in self.red_team.get_robots():
             robot.process_messages(self.red_team)
         for robot in self.blue_team.get_robots():
             robot.process_messages(self.blue_team)
+        if profiler is not None:
+            profiler.mark("process_messages")
 
         self.pickup_check = {}
-        self.make_decisions_and_take_actions(self.blue_team)
-        self.make_decisions_and_take_actions(self.red_team)
+        if self.pipeline == "two_phase":
+            self.decide_then_apply((self.blue_team, self.red_team))
+        else:
+            self.make_decisions_and_take_actions(self.blue_team)
+            self.make_decisions_and_take_actions(self.red_team)
+        if profiler is not None:
+            profiler.mark("decide_and_act")
         self.check_pickup_logic()
+        if profiler is not None:
+            profiler.mark("pickup")
         self.check_fumble()
+        if profiler is not None:
+            profiler.mark("fumble")
         self.check_drop_deposit()
+        if profiler is not None:
+            profiler.mark("deposit")
+
+        if self.trace is not None:
+            self.trace.record_messages("RED", self._count_messages(red_write_board, self.red_broadcast_board))
+            self.trace.record_messages("BLUE", self._count_messages(blue_write_board, self.blue_broadcast_board))
+        if profiler is not None:
+            profiler.count_messages("sent", self._count_messages(red_write_board, self.red_broadcast_board))
+            profiler.count_messages("sent", self._count_messages(blue_write_board, self.blue_broadcast_board))
         
         self._collect_and_queue_messages(red_write_board, self.red_message_queue)
         self._collect_and_queue_messages(blue_write_board, self.blue_message_queue)
-    
-    def _deliver_queued_messages(self, read_board, message_queue):
-        for robot_id in message_queue:
+        self._collect_and_queue_broadcasts(self.red_broadcast_board, self.red_team, self.red_message_queue)
+        self._collect_and_queue_broadcasts(self.blue_broadcast_board, self.blue_team, self.blue_message_queue)
+        if profiler is not None:
+            profiler.mark("queue_messages")
 
-            messages_to_deliver = [msg for msg in message_queue[robot_id] if msg[0] <= self.turn_count]
-            remaining_messages = [msg for msg in message_queue[robot_id] if msg[0] > self.turn_count]
-            
-            message_queue[robot_id] = remaining_messages
-            for delivery_turn, sender_id, message in messages_to_deliver:
-                read_board[robot_id].add(message)
-                # print(f"MSG DELAY: Message {message[0]} from {sender_id} delivered to {robot_id} at turn {self.turn_count} (sent at turn {delivery_turn - random.randint(1, 5)})")
+        if self.trace is not None:
+            self.trace.end_turn(self)
+        if self.metrics is not None:
+            self.metrics.record(self)
+        if profiler is not None:
+            profiler.end_turn(self)
+
+    def step_actions(self, actions, signals=None):
+        # One turn driven from outside instead of by Robot.make_decision:
+        # actions[i] is the action of robot i in red-then-blue id order (None
+        # waits). signals, if given, holds a Signal or None per robot in the
+        # same order, broadcast to its team with the usual delays. There is no
+        # Paxos traffic; pickups, fumbles and deposits resolve exactly as in
+        # next_turn.
+        self.turn_count += 1
+        self.pickup_check = {}
+        robots = self.red_team.get_robots() + self.blue_team.get_robots()
+        self._apply_actions(robots, actions)
+        self.check_pickup_logic()
+        self.check_fumble()
+        self.check_drop_deposit()
+        if signals is not None:
+            for robot, signal in zip(robots, signals):
+                if signal is not None:
+                    board = self.red_broadcast_board if robot.team == "RED" else self.blue_broadcast_board
+                    board.append((robot.id, signal))
+            self._collect_and_queue_broadcasts(self.red_broadcast_board, self.red_team, self.red_message_queue)
+            self._collect_and_queue_broadcasts(self.blue_broadcast_board, self.blue_team, self.blue_message_queue)
+        # Signals due next turn are handed out now, so whoever picks the next
+        # actions has them, as a robot has its mail at the start of its turn
+        self._deliver_signals(self.turn_count + 1)
+        if self.trace is not None:
+            self.trace.end_turn(self)
+        if self.metrics is not None:
+            self.metrics.record(self)
+
+    def _deliver_signals(self, turn):
+        # Only broadcasts matter here: direct messages come from Paxos robots,
+        # which step_actions does not run
+        for message_queue, robot_manager in ((self.red_message_queue, self.red_team),
+                                             (self.blue_message_queue, self.blue_team)):
+            _, broadcasts = message_queue.pop_due(turn)
+            for recipient_ids, payload in broadcasts:
+                for robot_id in recipient_ids:
+                    robot_manager.get_robot_by_id(robot_id).status_inbox.append(payload)
+
+    def _count_messages(self, write_board, broadcast_board):
+        counts = {}
+        for messages in write_board:
+            for message in messages:
+                counts[message.kind] = counts.get(message.kind, 0) + 1
+        for _, payload in broadcast_board:
+            counts[payload.kind] = counts.get(payload.kind, 0) + 1
+        return counts
     
-    def _collect_and_queue_messages(self, write_board, message_queue):
-        for sender_id in write_board:
-            for message in write_board[sender_id]:
-                pass
-        
+    def _deliver_queued_messages(self, read_board, message_queue, robot_manager):
+        direct, broadcasts = message_queue.pop_due(self.turn_count)
+        if self.profiler is not None:
+            counts = {}
+            for _, message in direct:
+                counts[message.kind] = counts.get(message.kind, 0) + 1
+            for recipient_ids, payload in broadcasts:
+                counts[payload.kind] = counts.get(payload.kind, 0) + len(recipient_ids)
+            self.profiler.count_messages("delivered", counts)
+        for robot_id, message in direct:
+            read_board[robot_id].add(message)
+            # print(f"MSG DELAY: Message {message} delivered to {robot_id} at turn {self.turn_count}")
+        for recipient_ids, payload in broadcasts:
+            for robot_id in recipient_ids:
+                robot_manager.get_robot_by_id(robot_id).status_inbox.append(payload)
+    
+    def _collect_and_queue_broadcasts(self, broadcast_board, robot_manager, message_queue):
+        # One scheduled entry per (payload, delivery turn): recipients still get
+        # their own random delay but share the payload itself
+        robot_ids = [robot.id for robot in robot_manager.get_robots()]
+        min_delay, max_delay = self.message_delay
+        for sender_id, payload in broadcast_board:
+            recipients_by_turn = {}
+            for recipient_id in robot_ids:
+                if recipient_id != sender_id:
+                    delivery_turn = self.turn_count + random.randint(min_delay, max_delay)
+                    recipients_by_turn.setdefault(delivery_turn, []).append(recipient_id)
+            for delivery_turn, recipient_ids in recipients_by_turn.items():
+                message_queue.schedule_broadcast(recipient_ids, payload, delivery_turn)
+        broadcast_board.clear()
 
-        for recipient_id in write_board:
-            for message in write_board[recipient_id]:
-                # Random delay between 1 and 5 turns
-                delay = random.randint(1, 5)
+    def _collect_and_queue_messages(self, write_board, message_queue):
+        min_delay, max_delay = self.message_delay
+        for recipient_id, messages in enumerate(write_board):
+            for message in messages:
+                # Random delay between min_delay and max_delay turns
+                delay = random.randint(min_delay, max_delay)
                 delivery_turn = self.turn_count + delay
-                message_queue[recipient_id].append((delivery_turn, '?', message))
-                # print(f"MSG DELAY: Message {message[0]} queued for {recipient_id}, will arrive at turn {delivery_turn} (delay: {delay} turns)")
+                message_queue.schedule(recipient_id, message, delivery_turn)
+                # print(f"MSG DELAY: Message {message} queued for {recipient_id}, will arrive at turn {delivery_turn} (delay: {delay} turns)")
+
+    def get_message_backlog(self):
+        return {
+            "RED": self.red_message_queue.get_stats(),
+            "BLUE": self.blue_message_queue.get_stats(),
+        }
+
+    def get_consensus_stats(self):
+        return {team: metrics.summary() for team, metrics in self.consensus_metrics.items()}
 
     def make_decisions_and_take_actions(self, robot_manager):
         # print(f"{robot_manager.team} Robots Decisions")
-        for robot in robot_manager.get_robots():
-            robot.observe(self.grid)
-            action = robot.make_decision(robot_manager)
+        robots = robot_manager.get_robots()
+        self.observe_all(robots)
+        # Robots whose view a teammate moved or turned in earlier in this pass
+        # observe again so they still see those moves
+        profiler = self.profiler
+        for robot in robots:
+            if self.grid.changed_since(robot.observable_cells, robot.view_stamp):
+                robot.observe(self.grid)
+            if profiler is None:
+                action = robot.make_decision(robot_manager)
+            else:
+                start = time.perf_counter()
+                action = robot.make_decision(robot_manager)
+                profiler.record_decision(robot, time.perf_counter() - start)
             if action == "PICK_UP":
                 if robot.current_coord not in self.pickup_check:
                     self.pickup_check[robot.current_coord] = []
@@ -133,6 +388,90 @@ class World:
             
             # print(f"Robot {robot.id} decided to {action}")
             robot.take_action(action, self.grid)
+            if self.trace is not None:
+                self.trace.record_action(robot, action)
+
+    def decide_then_apply(self, robot_managers):
+        jobs = [(robot, robot_manager) for robot_manager in robot_managers for robot in robot_manager.get_robots()]
+
+        # Observe: everyone sees the world as it was at the start of the turn
+        self.observe_all([robot for robot, _ in jobs])
+
+        # Decide: each robot only changes itself and writes to a private outbox
+        # and consensus tally with its own RNG, so the order (or thread)
+        # decisions run in does not matter
+        team_boards = []
+        for robot, _ in jobs:
+            team_boards.append((robot.message_board, robot.broadcast_board, robot.consensus_metrics))
+            robot.message_board = Outbox()
+            robot.broadcast_board = []
+            robot.consensus_metrics = ConsensusTally()
+            robot.rng = random.Random(random.getrandbits(64))
+        decide = _decide if self.profiler is None else _decide_timed
+        if self.decision_workers:
+            if self.decision_pool is None:
+                self.decision_pool = ThreadPoolExecutor(max_workers=self.decision_workers)
+            actions = list(self.decision_pool.map(decide, jobs))
+        else:
+            actions = [decide(job) for job in jobs]
+        if self.profiler is not None:
+            for (robot, _), (_, seconds) in zip(jobs, actions):
+                self.profiler.record_decision(robot, seconds)
+            actions = [action for action, _ in actions]
+
+        for (robot, _), (message_board, broadcast_board, consensus_metrics) in zip(jobs, team_boards):
+            for recipient_id, messages in robot.message_board.items():
+                message_board[recipient_id].update(messages)
+            broadcast_board.extend(robot.broadcast_board)
+            consensus_metrics.merge(robot.consensus_metrics)
+            robot.message_board = message_board
+            robot.broadcast_board = broadcast_board
+            robot.consensus_metrics = consensus_metrics
+
+        self._apply_actions([robot for robot, _ in jobs], actions)
+
+    def _apply_actions(self, robots, actions):
+        # Moves and turns only affect the acting robot; competing PICK_UPs on
+        # the same gold are resolved afterwards in check_pickup_logic
+        for robot, action in zip(robots, actions):
+            if action == "PICK_UP":
+                self.pickup_check.setdefault(robot.current_coord, []).append((robot.id, robot.team))
+            robot.take_action(action, self.grid)
+            if self.trace is not None:
+                self.trace.record_action(robot, action)
+
+    def observe_all(self, robots):
+        # Batched observation: every grid cell and robot listing is looked up
+        # once per pass and shared by all robots that can see it. Robots that
+        # have not moved or turned, and whose cells have not changed since they
+        # last looked, keep their observation.
+        index = get_visibility_index(self.width, self.height)
+        grid = self.grid
+        clock = grid.clock
+        seen = {}
+        reused = 0
+        for robot in robots:
+            observable_cells = index.get(robot.current_coord, robot.facing)
+            if observable_cells is robot.observable_cells and not grid.changed_since(observable_cells, robot.view_stamp):
+                robot.keep_observation(clock)
+                reused += 1
+                continue
+            gold_seen = {}
+            visible_robots = {}
+            for coord in observable_cells:
+                entry = seen.get(coord)
+                if entry is None:
+                    cell = grid.get_cell(coord)
+                    robots_at_coord = [(r.id, r.team, r.facing) for r in cell.red_robots]
+                    robots_at_coord += [(r.id, r.team, r.facing) for r in cell.blue_robots]
+                    entry = seen[coord] = (cell.get_gold_amount() or 0, robots_at_coord)
+                gold_seen[coord] = entry[0]
+                if entry[1]:
+                    visible_robots[coord] = entry[1]
+            robot.set_observation(observable_cells, gold_seen, visible_robots, clock)
+        if self.profiler is not None:
+            self.profiler.count("observations", len(robots))
+            self.profiler.count("observations_reused", reused)
 
     def check_pickup_logic(self):
         for coord, robots in self.pickup_check.items():
@@ -149,37 +488,66 @@ class World:
 
             red_pair_present = len(reds) == 2
             blue_pair_present = len(blues) == 2
+            if red_pair_present or blue_pair_present:
+                self.grid.mark_dirty(coord)
 
             if red_pair_present and blue_pair_present:
                 if gold_amount >= 2:
                     if self.red_team.pickup_gold(reds[0][0], reds[1][0]):
                         cell.remove_gold()
+                        self._record_pickup(self.red_team, reds, coord)
                     if self.blue_team.pickup_gold(blues[0][0], blues[1][0]):
                         cell.remove_gold()
+                        self._record_pickup(self.blue_team, blues, coord)
             
             elif red_pair_present:
                 if gold_amount >= 1:
                     if self.red_team.pickup_gold(reds[0][0], reds[1][0]):
                         cell.remove_gold()
+                        self._record_pickup(self.red_team, reds, coord)
                         # print(f"{reds[0][0]} and {reds[1][0]} has SUCCESSFULLY picked up a GOLD BAR")  
 
             elif blue_pair_present:
                 if gold_amount >= 1:
                     if self.blue_team.pickup_gold(blues[0][0], blues[1][0]):
                         cell.remove_gold()
+                        self._record_pickup(self.blue_team, blues, coord)
                         # print(f"{blues[0][0]} and {blues[1][0]} has SUCCESSFULLY picked up a GOLD BAR")
 
+    def _record_pickup(self, robot_manager, pair, coord):
+        if not self.grid.get_cell(coord).get_gold_amount():
+            for navigation in self.navigation.values():
+                navigation.forget(coord)
+        if self.profiler is not None:
+            self.profiler.count("pickups")
+        if self.metrics is not None:
+            self.metrics.gold_changed(-1)
+        if self.trace is not None:
+            robot_1 = robot_manager.get_robot_by_id(pair[0][0])
+            robot_2 = robot_manager.get_robot_by_id(pair[1][0])
+            self.trace.record_pickup(robot_1, robot_2, coord)
+
     def check_fumble(self):
         fumbled_gold_coords = []
         for robot in self.red_team.get_carrying_robots() + self.blue_team.get_carrying_robots():
-            if robot.pair_id:
-                pair_robot = self.red_team.get_robot_by_id(robot.pair_id) or self.blue_team.get_robot_by_id(robot.pair_id)
+            if robot.pair_id is not None:
+                team = self.red_team if robot.team == "RED" else self.blue_team
+                pair_robot = team.get_robot_by_id(robot.pair_id)
                 if pair_robot and robot.current_coord != pair_robot.current_coord:
                     fumbled_gold_coords.append(robot.drop_gold())
                     pair_robot.drop_gold()
+                    if self.trace is not None:
+                        self.trace.record_fumble(robot, pair_robot, fumbled_gold_coords[-1])
+                    if self.profiler is not None:
+                        self.profiler.count("fumbles")
         
         for coord in fumbled_gold_coords:
-            self.grid.get_cell(coord).add_gold()
+            cell = self.grid.get_cell(coord)
+            cell.add_gold()
+            self.grid.mark_dirty(coord)
+            # Gold fumbled onto a deposit box counts for its team instead
+            if self.metrics is not None and not cell.is_deposit_box():
+                self.metrics.gold_changed(1)
 
     def check_drop_deposit(self):
         for robot in self.red_team.get_carrying_robots():
@@ -188,9 +556,15 @@ class World:
                 if pair_robot and robot.current_coord == pair_robot.current_coord:
                     robot.score_gold()
                     pair_robot.score_gold()
+                    if self.trace is not None:
+                        self.trace.record_deposit(robot, pair_robot, self.red_deposit_box)
+                    if self.profiler is not None:
+                        self.profiler.count("deposits")
                     self.red_score += 1
                     self.grid.get_cell(self.red_deposit_box).increment_score()
-                    print(f"RED: {self.red_score} | BLUE: {self.blue_score}")
+                    self.grid.mark_dirty(self.red_deposit_box)
+                    if self.verbose:
+                        print(f"RED: {self.red_score} | BLUE: {self.blue_score}")
 
         for robot in self.blue_team.get_carrying_robots():
             if robot.current_coord == self.blue_deposit_box:
@@ -198,9 +572,15 @@ class World:
                 if pair_robot and robot.current_coord == pair_robot.current_coord:
                     robot.score_gold()
                     pair_robot.score_gold()
+                    if self.trace is not None:
+                        self.trace.record_deposit(robot, pair_robot, self.blue_deposit_box)
+                    if self.profiler is not None:
+                        self.profiler.count("deposits")
                     self.blue_score += 1
                     self.grid.get_cell(self.blue_deposit_box).increment_score()
-                    print(f"RED: {self.red_score} | BLUE: {self.blue_score}")
+                    self.grid.mark_dirty(self.blue_deposit_box)
+                    if self.verbose:
+                        print(f"RED: {self.red_score} | BLUE: {self.blue_score}")
 
     def print_grid(self):
         print(self.grid)
@@ -208,4 +588,13 @@ class World:
     def print_robots(self):
         for robot in self.red_team.get_robots() + self.blue_team.get_robots():
             pass
-            print(robot)
\ No newline at end of file
+            print(robot)
+
+def _decide(job):
+    robot, robot_manager = job
+    return robot.make_decision(robot_manager)
+
+def _decide_timed(job):
+    start = time.perf_counter()
+    action = _decide(job)
+    return action, time.perf_counter() - start